@@ -1,9 +1,13 @@
 import sys
+import argparse
+import cProfile
+import tracemalloc
 import math
 import random
 import time
 import json
 import os
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import List, Tuple, Optional
 
@@ -14,7 +18,10 @@ import pygame
 # -------------------------
 WIDTH, HEIGHT = 1280, 720
 FPS = 60
+PAUSED_FPS = 30  # menus and pause screen are static, so tick them slower
+HUB_IDLE_FPS = 15  # safe area while nothing on screen changes
 TILE = 48
+FRAME_TIME = 1 / FPS
 BG_COLOR = (18, 18, 24)
 WHITE = (240, 240, 240)
 BLACK = (12, 12, 16)
@@ -27,6 +34,11 @@ ORANGE = (240, 140, 70)
 CYAN = (80, 220, 230)
 GRAY = (120, 120, 130)
 
+# Dirty-rect display updates: the HUD band is always pushed, and the frame
+# falls back to a full flip once the dirty area passes this share of the screen
+HUD_BAND = pygame.Rect(0, 0, WIDTH, 200)
+DIRTY_FLIP_RATIO = 0.6
+
 FONT_NAME = "segoeui"
 SAVE_FILE = "save.json"
 
@@ -44,6 +56,22 @@ SWORD_RANGE = 50
 MAGIC_SPEED = 8
 MAGIC_RADIUS = 8
 INVULN_TIME = 0.6
+MANA_REGEN_RATE = 0.02 * FPS  # +1 mana events per second in combat (was a 2% roll every frame)
+
+# Status effect codes (index into EFFECT_APPLIERS)
+EFF_NONE = 0
+EFF_BLEED = 1
+EFF_NO_HEAL = 2
+EFF_POISON = 3
+EFF_BURN = 4
+EFF_SLOW = 5
+EFF_KNOCKBACK = 6
+EFF_TRAUMA = 7
+
+# Drop kind codes (index into _PICKUP_COLORS)
+DROP_GOLD = 0
+DROP_EXP = 1
+DROP_HEAL = 2
 
 # Waves / bosses
 MINION_WAVES_PER_STAGE = 5
@@ -101,28 +129,55 @@ ARMORS = {
 }
 ORDERED_WEAPONS = ["starter", "wood", "twin_daggers", "long_sword", "war_axe", "war_hammer", "god_sword"]
 ORDERED_ARMORS = ["none", "light", "medium", "heavy", "super", "god"]
+_WEAPON_INDEX = {k: i for i, k in enumerate(ORDERED_WEAPONS)}
+_ARMOR_INDEX = {k: i for i, k in enumerate(ORDERED_ARMORS)}
 BASE_SWORD_RANGE = SWORD_RANGE
 
 def get_weapon(player: "Player"):
-    return WEAPONS.get(player.weapon_id, WEAPONS["starter"])
+    return player.weapon_data
 
 def get_armor(player: "Player"):
-    return ARMORS.get(player.armor_id, ARMORS["none"])
+    return player.armor_data
+
+def equip_weapon(player: "Player", wid: str):
+    """Equip a weapon and copy its combat stats onto the player"""
+    player.weapon_id = wid
+    player.weapon_data = wpn = WEAPONS.get(wid, WEAPONS["starter"])
+    player.weapon_range = wpn["range"]
+    player.weapon_dmg = wpn["dmg"]
+    player.weapon_mult = wpn["mult"]
+    player.next_weapon_id = ORDERED_WEAPONS[(_WEAPON_INDEX.get(wid, 0) + 1) % len(ORDERED_WEAPONS)]
+
+def equip_armor(player: "Player", aid: str):
+    """Equip an armor and copy its hit capacity onto the player"""
+    player.armor_id = aid
+    player.armor_data = ARMORS.get(aid, ARMORS["none"])
+    player.max_armor_hits = player.armor_data["hits"]
+    player.next_armor_id = ORDERED_ARMORS[(_ARMOR_INDEX.get(aid, 0) + 1) % len(ORDERED_ARMORS)]
+
+def play_sound(snd: Optional["pygame.mixer.Sound"]):
+    """Play a sound if it loaded"""
+    if snd:
+        snd.play()
 
 def apply_audio_settings(state: "GameState"):
     """Apply current audio settings to pygame mixer and sounds"""
     try:
-        # Apply music volume
+        # Apply music volume (only when it actually changed)
         if state.music_enabled and state.sound_enabled:
-            pygame.mixer.music.set_volume(state.music_volume * state.volume)
+            music_vol = state.music_volume * state.volume
         else:
-            pygame.mixer.music.set_volume(0.0)
+            music_vol = 0.0
+        if music_vol != state.last_music_volume:
+            pygame.mixer.music.set_volume(music_vol)
+            state.last_music_volume = music_vol
         
         # Apply SFX volume to all loaded sounds
         sfx_vol = state.sfx_volume * state.volume if state.sound_enabled else 0.0
-        for sound in state.sounds.values():
-            if sound:
+        if sfx_vol != state.last_sfx_volume:
+            for sound in state.loaded_sounds:
                 sound.set_volume(sfx_vol)
+            state.last_sfx_volume = sfx_vol
     except Exception:
         pass
 
@@ -142,6 +197,11 @@ def toggle_fullscreen(state: "GameState"):
 # -------------------------
 # Helpers
 # -------------------------
+# Level-up stat name -> StatBlock attribute
+_LEVEL_UP_ATTRS = {"attack": "atk", "magic": "mag", "health": "hp", "mana": "mana"}
+# Automatic level-up order: Attack -> Magic -> Health -> Mana
+LEVEL_UP_CYCLE = ("Attack", "Magic", "Health", "Mana")
+
 @dataclass
 class StatBlock:
     hp: int
@@ -151,14 +211,9 @@ class StatBlock:
     spd: int
 
     def level_up(self, stat: str):
-        if stat == "attack":
-            self.atk = int(self.atk * (1 + LEVEL_UP_INCREASE_PERCENT))
-        elif stat == "magic":
-            self.mag = int(self.mag * (1 + LEVEL_UP_INCREASE_PERCENT))
-        elif stat == "health":
-            self.hp = int(self.hp * (1 + LEVEL_UP_INCREASE_PERCENT))
-        elif stat == "mana":
-            self.mana = int(self.mana * (1 + LEVEL_UP_INCREASE_PERCENT))
+        attr = _LEVEL_UP_ATTRS.get(stat)
+        if attr is not None:
+            setattr(self, attr, int(getattr(self, attr) * (1 + LEVEL_UP_INCREASE_PERCENT)))
 
 @dataclass
 class Entity:
@@ -174,10 +229,26 @@ class Entity:
     name: str = ""
     invuln_timer: float = 0.0
 
+    def __post_init__(self):
+        # Reused by rect(); callers only test against it and never keep it
+        self._rect = pygame.Rect(int(self.x), int(self.y), self.w, self.h)
+
     def rect(self) -> pygame.Rect:
-        return pygame.Rect(int(self.x), int(self.y), self.w, self.h)
+        r = self._rect
+        r.x = int(self.x)
+        r.y = int(self.y)
+        return r
 
-@dataclass
+def _ticks_to_exit(pos: float, vel: float, limit: int) -> int:
+    """First frame at which pos + n * vel falls outside [0, limit]"""
+    if vel > 0:
+        return int((limit - pos) // vel) + 1
+    if vel < 0:
+        return int(pos // -vel) + 1
+    return sys.maxsize
+
+
+@dataclass(slots=True)
 class Projectile:
     x: float
     y: float
@@ -187,18 +258,45 @@ class Projectile:
     color: Tuple[int, int, int]
     radius: int = MAGIC_RADIUS
     from_player: bool = True
-    # Optional status effect applied on hit (e.g., 'bleed', 'burn_no_heal')
-    effect: Optional[str] = None
+    # Status effect applied on hit (EFF_* code, e.g. EFF_BLEED, EFF_NO_HEAL)
+    effect: int = EFF_NONE
     effect_value: float = 0.0       # dps or magnitude depending on effect
     effect_duration: float = 0.0    # seconds
+    # Frames until the projectile leaves the screen (straight-line flight)
+    ticks_left: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        self.ticks_left = max(1, min(_ticks_to_exit(self.x, self.vx, WIDTH),
+                                     _ticks_to_exit(self.y, self.vy, HEIGHT)))
+
+    def reset(self, x, y, vx, vy, damage, color, radius=MAGIC_RADIUS, from_player=True,
+              effect=EFF_NONE, effect_value=0.0, effect_duration=0.0):
+        """Reinitialize a pooled projectile; mirrors __init__"""
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.damage = damage
+        self.color = color
+        self.radius = radius
+        self.from_player = from_player
+        self.effect = effect
+        self.effect_value = effect_value
+        self.effect_duration = effect_duration
+        self.__post_init__()
 
     def update(self):
         self.x += self.vx
         self.y += self.vy
+        self.ticks_left -= 1
 
     def pos(self):
         return (int(self.x), int(self.y))
 
+    def pos_topleft(self):
+        """Top-left corner of the projectile's sprite (see circle_sprite)"""
+        return (int(self.x) - self.radius, int(self.y) - self.radius)
+
 # -------------------------
 # Player and enemies
 # -------------------------
@@ -215,14 +313,38 @@ class Player(Entity):
     weapon_id: str = "starter"
     armor_id: str = "none"
     armor_hits_remaining: int = 0
+    # Equipped stats, derived from weapon_id/armor_id by equip_weapon/equip_armor
+    # (also on construction, see __post_init__)
+    weapon_data: dict = field(init=False, repr=False)
+    armor_data: dict = field(init=False, repr=False)
+    weapon_range: float = field(init=False)
+    weapon_dmg: float = field(init=False)
+    weapon_mult: float = field(init=False)
+    # What the merchant offers next (cycles back to the start after the last item)
+    next_weapon_id: str = field(init=False)
+    next_armor_id: str = field(init=False)
+    max_armor_hits: int = field(init=False)
+    # Cached body center, refreshed by sync_center() whenever x/y change
+    cx: float = 0.0
+    cy: float = 0.0
     # Status effects
     bleed_time_left: float = 0.0
     bleed_tick_accum: float = 0.0
     bleed_dps: float = 0.0
     no_heal_time_left: float = 0.0
 
+    def __post_init__(self):
+        super().__post_init__()
+        equip_weapon(self, self.weapon_id)
+        equip_armor(self, self.armor_id)
+        self.sync_center()
+
+    def sync_center(self):
+        self.cx = self.x + self.w * 0.5
+        self.cy = self.y + self.h * 0.5
+
     def center(self):
-        return self.x + self.w / 2, self.y + self.h / 2
+        return self.cx, self.cy
 
     def move(self, keys, player_index=0):
         dx = dy = 0
@@ -257,26 +379,25 @@ class Player(Entity):
         self.vy = (dy / length) * self.spd
         self.x = max(0, min(WIDTH - self.w, self.x + self.vx))
         self.y = max(0, min(HEIGHT - self.h, self.y + self.vy))
+        self.sync_center()
 
-    def sword_attack(self, enemies: List[Entity]):
+    def sword_attack(self, enemies: List["Enemy"], now: float):
         # Melee using weapon stats (range/damage/multiplier)
-        wpn = get_weapon(self)
-        cx, cy = self.center()
-        melee_range = BASE_SWORD_RANGE + wpn["range"]
-        base_damage = max(1, self.atk + wpn["dmg"])  # base damage plus weapon flat bonus
-        damage = int(base_damage * wpn["mult"])      # apply multiplier (e.g., twin daggers)
+        cx, cy = self.cx, self.cy
+        melee_range = BASE_SWORD_RANGE + self.weapon_range
+        range_sq = melee_range * melee_range
+        base_damage = max(1, self.atk + self.weapon_dmg)  # base damage plus weapon flat bonus
+        damage = int(base_damage * self.weapon_mult)      # apply multiplier (e.g., twin daggers)
         hit_any = False
         for e in enemies:
             if e.hp <= 0: continue
-            ex, ey = e.x + e.w/2, e.y + e.h/2
-            if math.hypot(ex - cx, ey - cy) <= melee_range:
+            dx, dy = e.x + e.w/2 - cx, e.y + e.h/2 - cy
+            if dx*dx + dy*dy <= range_sq:
                 e.hp -= damage
                 e.invuln_timer = INVULN_TIME
                 # Track last hit source/time for enemy behaviors
-                if hasattr(e, 'last_hit_time'):
-                    e.last_hit_time = time.time()
-                if hasattr(e, 'data'):
-                    e.data['last_hit_by_sword'] = True
+                e.last_hit_time = now
+                e.last_hit_by_sword = True
                 hit_any = True
         return hit_any
 
@@ -284,7 +405,7 @@ class Player(Entity):
         if self.mana < MAGIC_MANA_COST:
             return None
         self.mana -= MAGIC_MANA_COST
-        cx, cy = self.center()
+        cx, cy = self.cx, self.cy
         tx, ty = target_pos
         dx, dy = tx - cx, ty - cy
         dist = math.hypot(dx, dy) or 1
@@ -297,13 +418,14 @@ class Player(Entity):
         if self.mana < DASH_MANA_COST:
             return
         self.mana -= DASH_MANA_COST
-        cx, cy = self.center()
+        cx, cy = self.cx, self.cy
         tx, ty = mouse_pos
         dx, dy = tx - cx, ty - cy
         dist = math.hypot(dx, dy) or 1
         dash_len = 80
         self.x = max(0, min(WIDTH - self.w, self.x + (dash_len * dx / dist)))
         self.y = max(0, min(HEIGHT - self.h, self.y + (dash_len * dy / dist)))
+        self.sync_center()
 
 @dataclass
 class Enemy(Entity):
@@ -317,12 +439,12 @@ class Enemy(Entity):
     projectile_damage: int = 6
     projectile_color: Tuple[int, int, int] = ORANGE
     projectile_radius: int = MAGIC_RADIUS
-    projectile_effect: Optional[str] = None
+    projectile_effect: int = EFF_NONE
     projectile_effect_value: float = 0.0
     projectile_effect_duration: float = 0.0
     projectile_pattern: str = "aim"  # aim | cross4 | breath
     # On-hit status effects (melee contact)
-    on_hit_effect: Optional[str] = None
+    on_hit_effect: int = EFF_NONE
     on_hit_effect_value: float = 0.0
     on_hit_effect_duration: float = 0.0
     # Self-heal behavior
@@ -334,16 +456,28 @@ class Enemy(Entity):
     speed_doubles_at_half: bool = False
     sped_up: bool = False
     revived_once: bool = False
+    # Boss phase transitions checked every frame (plain fields, not data keys)
+    summon_thresholds: Optional[List[float]] = None  # pending HP fractions, highest first
+    heal_to_80_percent: bool = False
+    did_heal: bool = False
+    must_die_by_sword: bool = False
+    last_hit_by_sword: bool = False
+    twin: Optional["Enemy"] = field(default=None, repr=False, compare=False)  # Rox/Tox partner, buffed on death
+    twin_buff: float = 1.5  # damage multiplier given to the surviving twin
+    death_sound: Optional["pygame.mixer.Sound"] = field(default=None, repr=False, compare=False)  # see bind_death_sounds()
     data: dict = field(default_factory=dict)
     # Animation
     anim_timer: float = 0.0
+    # Resolved by draw_enemies on first draw: animation frames and boss-name flag
+    frames: tuple = field(default=(), repr=False, compare=False)
+    shows_name: bool = field(default=False, repr=False, compare=False)
 
-    def update(self, player: Player, obstacles=None):
+    def update(self, player: Player, obstacle_rects=None, flyer_rects=None):
         if self.hp <= 0:
             return
         
         # Update animation timer
-        self.anim_timer += 1/60.0  # Assuming 60 FPS
+        self.anim_timer += FRAME_TIME  # one frame at FPS
         if self.ai == "chase":
             px, py = player.x, player.y
             dx, dy = px - self.x, py - self.y
@@ -369,19 +503,12 @@ class Enemy(Entity):
                 self.vy = self.speed * dy / dist
             
             # Try to move around obstacles more intelligently
-            if obstacles:
+            # Imps ignore trees, ruins, and castle structures (they fly)
+            rects = flyer_rects if self.name == "Imp" else obstacle_rects
+            if rects:
                 # Check if direct path is blocked
                 test_rect = pygame.Rect(self.x + self.vx, self.y + self.vy, self.w, self.h)
-                blocked = False
-                for ob in obstacles:
-                    # Imps ignore trees, ruins, and castle structures (they fly)
-                    if self.name == "Imp" and ob.kind in ["tree", "ruin", "castle_wall", "castle_tower", "battlement"]:
-                        continue
-                    if test_rect.colliderect(ob.rect()):
-                        blocked = True
-                        break
-                
-                if blocked:
+                if collides_rect(test_rect, rects):
                     # Try alternative paths
                     alternatives = [
                         (self.vx * 0.7 + self.vy * 0.3, self.vy * 0.7 - self.vx * 0.3),  # Slight right turn
@@ -390,15 +517,9 @@ class Enemy(Entity):
                         (-self.vy, self.vx),  # -90 degree turn
                     ]
                     for alt_vx, alt_vy in alternatives:
-                        test_rect = pygame.Rect(self.x + alt_vx, self.y + alt_vy, self.w, self.h)
-                        alt_blocked = False
-                        for ob in obstacles:
-                            if self.name == "Imp" and ob.kind in ["tree", "ruin", "castle_wall", "castle_tower", "battlement"]:
-                                continue
-                            if test_rect.colliderect(ob.rect()):
-                                alt_blocked = True
-                                break
-                        if not alt_blocked:
+                        test_rect.x = int(self.x + alt_vx)
+                        test_rect.y = int(self.y + alt_vy)
+                        if not collides_rect(test_rect, rects):
                             self.vx, self.vy = alt_vx, alt_vy
                             break
             
@@ -414,6 +535,15 @@ class Enemy(Entity):
         self.x = max(0, min(WIDTH - self.w, self.x))
         self.y = max(0, min(HEIGHT - self.h, self.y))
 
+# Obstacle kinds that flying enemies (Imps) pass over
+FLYER_PASSABLE_KINDS = frozenset({"tree", "ruin", "castle_wall", "castle_tower", "battlement"})
+
+# Enemy shot patterns: unit direction vectors, and (cos, sin) of the breath
+# fan offsets so each fan only needs the trig of its base angle
+_CROSS4 = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_CROSS8 = _CROSS4 + tuple((dx * math.sqrt(0.5), dy * math.sqrt(0.5)) for dx, dy in ((1, 1), (-1, 1), (1, -1), (-1, -1)))
+_BREATH = tuple((math.cos(o), math.sin(o)) for o in (-0.4, -0.2, 0, 0.2, 0.4))
+
 @dataclass
 class Merchant(Entity):
     # Static NPC
@@ -469,47 +599,120 @@ class Obstacle:
     kind: str = "tree"  # tree | ruin | rock
     color: Tuple[int, int, int] = (80, 120, 60)
 
+    def __post_init__(self):
+        # Obstacles never move, so one Rect serves every collision test
+        self._rect = pygame.Rect(self.x, self.y, self.w, self.h)
+
     def rect(self) -> pygame.Rect:
-        return pygame.Rect(self.x, self.y, self.w, self.h)
+        return self._rect
+
+
+def collides_rect(rect: pygame.Rect, rects: List[pygame.Rect]) -> bool:
+    return rect.collidelist(rects) != -1
+
+
+# Spatial grid: 64px cells keyed by (x >> GRID_SHIFT, y >> GRID_SHIFT).
+# The cell size must stay >= the largest enemy so a projectile can only hit
+# enemies bucketed in its own cell or the cells to its left/top.
+GRID_SHIFT = 6
+
+
+def build_enemy_grid(enemies: List["Enemy"]) -> dict:
+    """Bucket living enemies by the grid cell of their top-left corner"""
+    grid = {}
+    for e in enemies:
+        if e.hp <= 0:
+            continue
+        key = (int(e.x) >> GRID_SHIFT, int(e.y) >> GRID_SHIFT)
+        cell = grid.get(key)
+        if cell is None:
+            grid[key] = [e]
+        else:
+            cell.append(e)
+    return grid
 
 
-def collides_rect(rect: pygame.Rect, obstacles: List["Obstacle"]) -> bool:
+def build_obstacle_grid(obstacles: List["Obstacle"]) -> dict:
+    """Bucket obstacle rects into every grid cell they overlap"""
+    grid = {}
     for ob in obstacles:
-        if rect.colliderect(ob.rect()):
-            return True
-    return False
+        for gx in range(ob.x >> GRID_SHIFT, ((ob.x + ob.w - 1) >> GRID_SHIFT) + 1):
+            for gy in range(ob.y >> GRID_SHIFT, ((ob.y + ob.h - 1) >> GRID_SHIFT) + 1):
+                grid.setdefault((gx, gy), []).append(ob._rect)
+    return grid
 
 
-def resolve_entity_collision(entity: Entity, obstacles: List["Obstacle"], prev_x: float, prev_y: float):
+def resolve_entity_collision(entity: Entity, obstacle_rects: List[pygame.Rect], prev_x: float, prev_y: float):
     # If entity overlaps an obstacle after moving, separate by axes using previous position
     r_now = entity.rect()
-    if not collides_rect(r_now, obstacles):
+    if not collides_rect(r_now, obstacle_rects):
         return
     # Try X only
     entity.x = prev_x + entity.vx
     entity.y = prev_y
-    if not collides_rect(entity.rect(), obstacles):
+    if not collides_rect(entity.rect(), obstacle_rects):
         return
     # Try Y only
     entity.x = prev_x
     entity.y = prev_y + entity.vy
-    if not collides_rect(entity.rect(), obstacles):
+    if not collides_rect(entity.rect(), obstacle_rects):
         return
     # Revert fully
     entity.x = prev_x
     entity.y = prev_y
 
 
-def random_free_spot(size: int, obstacles: List["Obstacle"], attempts: int = 100) -> Tuple[int, int]:
+# Free spawn cells per enemy size live in state.free_cells: prepare_arena()
+# resets the table for each arena and free_spawn_cells() fills it per size.
+SPAWN_CELL = 32
+
+
+def free_spawn_cells(size: int, obstacle_rects: List[pygame.Rect], free_cells: dict) -> List[Tuple[int, int]]:
+    """Top-left corners on a SPAWN_CELL grid where a size x size body fits.
+
+    free_cells is the arena's table (state.free_cells, reset by prepare_arena),
+    filled here once per body size.
+    """
+    cells = free_cells.get(size)
+    if cells is None:
+        cx, cy = WIDTH // 2, HEIGHT // 2
+        r = pygame.Rect(0, 0, size, size)
+        cells = []
+        for y in range(0, HEIGHT - size + 1, SPAWN_CELL):
+            for x in range(0, WIDTH - size + 1, SPAWN_CELL):
+                # keep some space from center (140px, compared squared)
+                if (x - cx) * (x - cx) + (y - cy) * (y - cy) < 140 * 140:
+                    continue
+                r.x = x
+                r.y = y
+                if not collides_rect(r, obstacle_rects):
+                    cells.append((x, y))
+        free_cells[size] = cells
+    return cells
+
+
+def random_free_spot(size: int, obstacle_rects: List[pygame.Rect], free_cells: dict,
+                     attempts: int = 100) -> Tuple[int, int]:
+    cells = free_spawn_cells(size, obstacle_rects, free_cells)
+    if cells:
+        x, y = random.choice(cells)
+        # jitter inside the cell, keeping the cell origin if that collides
+        jx = x + random.randint(0, min(SPAWN_CELL - 1, WIDTH - size - x))
+        jy = y + random.randint(0, min(SPAWN_CELL - 1, HEIGHT - size - y))
+        cx, cy = WIDTH // 2, HEIGHT // 2
+        if (jx - cx) * (jx - cx) + (jy - cy) * (jy - cy) >= 140 * 140:
+            if not collides_rect(pygame.Rect(jx, jy, size, size), obstacle_rects):
+                return jx, jy
+        return x, y
     cx, cy = WIDTH // 2, HEIGHT // 2
     for _ in range(attempts):
         x = random.randint(0, WIDTH - size)
         y = random.randint(0, HEIGHT - size)
-        # keep some space from center
-        if math.hypot(x - cx, y - cy) < 140:
+        # keep some space from center (140px, compared squared)
+        if (x - cx) * (x - cx) + (y - cy) * (y - cy) < 140 * 140:
             continue
         r = pygame.Rect(x, y, size, size)
-        if not collides_rect(r, obstacles):
+        if not collides_rect(r, obstacle_rects):
             return x, y
     # fallback
     return WIDTH // 2 - size // 2, HEIGHT // 2 - size // 2
@@ -517,18 +720,26 @@ def random_free_spot(size: int, obstacles: List["Obstacle"], attempts: int = 100
 
 def generate_arena_obstacles(stage: int) -> List["Obstacle"]:
     obstacles: List[Obstacle] = []
-    random.seed(stage * 1337)
+    rects: List[pygame.Rect] = []
+    # Private generator seeded per stage: same layouts as before, without
+    # reseeding the global RNG that spawns and drops draw from
+    rng = random.Random(stage * 1337)
+    randint = rng.randint
+    rand = rng.random
     count = 8 + min(6, stage // 2)
 
     def add_if_free(x, y, w, h, kind, color):
         r = pygame.Rect(x, y, w, h)
         if r.left < 0 or r.right > WIDTH or r.top < 0 or r.bottom > HEIGHT:
             return False
-        if collides_rect(r, obstacles):
+        if collides_rect(r, rects):
             return False
-        if math.hypot(x - WIDTH//2, y - HEIGHT//2) < 120:
+        dx, dy = x - WIDTH//2, y - HEIGHT//2
+        if dx * dx + dy * dy < 120 * 120:
             return False
-        obstacles.append(Obstacle(x, y, w, h, kind, color))
+        ob = Obstacle(x, y, w, h, kind, color)
+        obstacles.append(ob)
+        rects.append(ob._rect)
         return True
 
     # Determine terrain theme based on stage
@@ -536,56 +747,56 @@ def generate_arena_obstacles(stage: int) -> List["Obstacle"]:
         # Forest theme (Boss 1-4)
         # More trees, some rocks, minimal ruins
         for _ in range(count * 2 // 3):  # More trees
-            w = h = random.randint(36, 56)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+            w = h = randint(36, 56)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "tree", (70, 140, 70))
         
         # Add some larger trees for variety
         for _ in range(count // 4):
-            w = h = random.randint(60, 80)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+            w = h = randint(60, 80)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "tree", (60, 120, 60))
         
         # Few rocks scattered around
         for _ in range(count // 4):
-            w = h = random.randint(28, 42)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+            w = h = randint(28, 42)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "rock", (130, 130, 140))
             
     elif stage <= 9:
         # Ruined city theme (Boss 5-9)
         # More ruins, fewer trees, some rocks
         for _ in range(count * 2 // 3):  # More ruins
-            if random.random() < 0.6:
-                w, h = random.randint(140, 280), random.randint(15, 25)
+            if rand() < 0.6:
+                w, h = randint(140, 280), randint(15, 25)
             else:
-                w, h = random.randint(15, 25), random.randint(140, 280)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+                w, h = randint(15, 25), randint(140, 280)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "ruin", (110, 110, 120))
         
         # Add some broken pillars (square ruins)
         for _ in range(count // 4):
-            w = h = random.randint(40, 60)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+            w = h = randint(40, 60)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "ruin", (100, 100, 110))
         
         # Few dead trees
         for _ in range(count // 5):
-            w = h = random.randint(30, 45)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+            w = h = randint(30, 45)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "tree", (80, 70, 60))  # Dead tree color
         
         # Rubble (rocks)
         for _ in range(count // 4):
-            w = h = random.randint(25, 40)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+            w = h = randint(25, 40)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "rock", (120, 120, 130))
             
     else:
@@ -594,36 +805,36 @@ def generate_arena_obstacles(stage: int) -> List["Obstacle"]:
         
         # Add castle walls (long rectangular structures)
         for _ in range(count // 3):
-            if random.random() < 0.7:
-                w, h = random.randint(200, 350), random.randint(25, 35)
+            if rand() < 0.7:
+                w, h = randint(200, 350), randint(25, 35)
             else:
-                w, h = random.randint(25, 35), random.randint(200, 350)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+                w, h = randint(25, 35), randint(200, 350)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "castle_wall", (90, 90, 100))
         
         # Add castle towers (square structures)
         for _ in range(count // 3):
-            w = h = random.randint(60, 90)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+            w = h = randint(60, 90)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "castle_tower", (80, 80, 90))
         
         # Add some battlements (smaller wall segments)
         for _ in range(count // 4):
-            if random.random() < 0.5:
-                w, h = random.randint(80, 120), random.randint(20, 30)
+            if rand() < 0.5:
+                w, h = randint(80, 120), randint(20, 30)
             else:
-                w, h = random.randint(20, 30), random.randint(80, 120)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+                w, h = randint(20, 30), randint(80, 120)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "battlement", (100, 100, 110))
         
         # Add some castle debris
         for _ in range(count // 5):
-            w = h = random.randint(35, 50)
-            x = random.randint(0, WIDTH - w)
-            y = random.randint(0, HEIGHT - h)
+            w = h = randint(35, 50)
+            x = randint(0, WIDTH - w)
+            y = randint(0, HEIGHT - h)
             add_if_free(x, y, w, h, "rock", (110, 110, 120))
 
     return obstacles
@@ -681,14 +892,45 @@ def draw_obstacles(surface, obstacles: List["Obstacle"]):
         else:
             pygame.draw.rect(surface, ob.color, r)
 
+ARENA_COLOR = (30, 30, 35)
+
+def render_arena_bg(obstacles: List["Obstacle"]) -> pygame.Surface:
+    """Pre-render the arena floor and its static obstacles so each frame is a single opaque blit"""
+    bg = pygame.Surface((WIDTH, HEIGHT)).convert()
+    bg.fill(ARENA_COLOR)
+    draw_obstacles(bg, obstacles)
+    return bg
+
+def render_safe_bg(merchant_rect: pygame.Rect, merchant: "Merchant") -> pygame.Surface:
+    """Pre-render the safe-area hub with the merchant's stall and NPC"""
+    bg = pygame.Surface((WIDTH, HEIGHT)).convert()
+    bg.fill(BG_COLOR)
+    pygame.draw.rect(bg, (25, 40, 25), (0, 100, WIDTH, HEIGHT-200))
+    pygame.draw.rect(bg, (60, 60, 20), merchant_rect)
+    pygame.draw.rect(bg, (40, 40, 10), merchant_rect, 2)
+    pygame.draw.rect(bg, merchant.color, merchant.rect())
+    return bg
+
 # -------------------------
 # Utility draw
 # -------------------------
 
+# Bar background + border surfaces keyed by (w, h, color_bg)
+_BAR_FRAMES = {}
+
 def draw_bar(surface, x, y, w, h, ratio, color_fg, color_bg=BLACK):
-    pygame.draw.rect(surface, color_bg, (x, y, w, h))
-    pygame.draw.rect(surface, color_fg, (x, y, int(w * max(0, min(1, ratio))), h))
-    pygame.draw.rect(surface, WHITE, (x, y, w, h), 2)
+    key = (w, h, color_bg)
+    frame = _BAR_FRAMES.get(key)
+    if frame is None:
+        frame = pygame.Surface((w, h)).convert()
+        frame.fill(color_bg)
+        pygame.draw.rect(frame, WHITE, (0, 0, w, h), 2)
+        _BAR_FRAMES[key] = frame
+    surface.blit(frame, (x, y))
+    # Only fill inside the 2px border so the cached border stays on top
+    fill_w = min(int(w * max(0, min(1, ratio))), w - 2) - 2
+    if fill_w > 0 and h > 4:
+        pygame.draw.rect(surface, color_fg, (x + 2, y + 2, fill_w, h - 4))
 
 # -------------------------
 # Game flow and state
@@ -696,11 +938,14 @@ def draw_bar(surface, x, y, w, h, ratio, color_fg, color_bg=BLACK):
 @dataclass
 class GameState:
     stage: int = 1
-    wave: int = 1
+    wave: int = 1  # assign through set_wave() so the flags below stay in sync
+    is_minion_wave: bool = True   # wave <= MINION_WAVES_PER_STAGE
+    is_boss_wave: bool = False    # wave == MINION_WAVES_PER_STAGE + 1
     in_safe_area: bool = False
     enemies: List[Enemy] = field(default_factory=list)
     projectiles: List[Projectile] = field(default_factory=list)
-    drops: List[Tuple[int,int,str,int]] = field(default_factory=list)  # (x, y, type: gold|exp|heal, amount)
+    projectile_pool: List[Projectile] = field(default_factory=list)  # spent projectiles for reuse
+    drops: List[Tuple[int,int,int,int]] = field(default_factory=list)  # (x, y, DROP_* kind code, amount)
     last_spawn: float = 0.0
     show_stats: bool = False  # Stats page toggle
     player: Player = field(default_factory=lambda: Player(
@@ -712,13 +957,25 @@ class GameState:
     ))
     font_big: Optional[pygame.font.Font] = None
     font_small: Optional[pygame.font.Font] = None
+    # Rendered text surfaces keyed by (font, text, color); see render_text()
+    text_cache: OrderedDict = field(default_factory=OrderedDict)
+    menu_cache: dict = field(default_factory=dict)  # static menu pages, see build_menu_cache()
+    merchant_hints: dict = field(default_factory=dict)  # (next_w, next_a) -> (weapon hint, armor hint) surfaces
+    hud_group: Optional[pygame.sprite.RenderUpdates] = None  # see build_hud_group()
+    last_dirty: List[pygame.Rect] = field(default_factory=list)  # entity rects pushed last frame
+    full_redraw: bool = True  # next frame must flip the whole display (scene change, menus)
+    hub_view_key: Optional[tuple] = None  # what the safe area showed last frame, see _hub_view_key()
+    hub_idle: bool = False  # safe area frame was unchanged; tick at HUB_IDLE_FPS
     info_message: str = ""
     info_timer: float = 0.0
+    current_banner: Optional[pygame.Surface] = None  # rendered once when a boss wave starts
+    banner_timer: float = 0.0
 
     # New: score, timer, pause/menu, sounds
     score: int = 0
     stage_start_score: int = 0  # Score at beginning of current stage
     play_time: float = 0.0
+    game_clock: float = 0.0  # seconds of unpaused play, including the safe area
     new_game_plus: int = 0  # Track how many times secret boss was killed
     post_boss_10_delay: float = 0.0  # 20 second delay after boss 10
     paused: bool = False
@@ -727,6 +984,17 @@ class GameState:
     menu_index: int = 0
     controls_expanded: bool = False
     sounds: dict = field(default_factory=dict)
+    snd_boss_explode: Optional["pygame.mixer.Sound"] = None
+    snd_swing: Optional["pygame.mixer.Sound"] = None
+    snd_fireball: Optional["pygame.mixer.Sound"] = None
+    snd_menu_move: Optional["pygame.mixer.Sound"] = None
+    snd_menu_confirm: Optional["pygame.mixer.Sound"] = None
+    # Sounds that actually loaded, and the volumes last pushed to the mixer
+    loaded_sounds: tuple = ()
+    last_sfx_volume: float = -1.0
+    last_music_volume: float = -1.0
+    audio_dirty: bool = False  # settings changed; applied once after the event loop
+    menu_needs_redraw: bool = True  # menu screens are static; redraw only after input
     volume: float = 0.6
     # Display settings
     fullscreen: bool = False
@@ -736,32 +1004,50 @@ class GameState:
     music_volume: float = 0.5
     sfx_volume: float = 0.7
     # Menu input debouncing
-    menu_last_nav_time: float = 0.0
+    menu_next_nav_time: float = 0.0  # deadline on the frame's monotonic clock
     menu_nav_delay: float = 0.15
     # Volume adjust tick throttle
     volume_last_time: float = 0.0
     volume_tick_delay: float = 0.08
 
-    # Waves: inter-wave cooldown and pending spawn flag
-    wave_cooldown: float = 0.0
-    pending_spawn: bool = False
+    # Waves: game_clock time at which the pending wave spawns (None when no spawn is pending)
+    next_spawn_time: Optional[float] = None
     
     # Sprite images
     imp_sprites: List[pygame.Surface] = field(default_factory=list)
     bee_sprites: List[pygame.Surface] = field(default_factory=list)
     fly_sprites: List[pygame.Surface] = field(default_factory=list)
 
-    # Health regen timers
-    hp_regen_timer: float = 0.0
+    # Regen deadlines on game_clock
+    next_hp_regen_time: float = 1.0
     hp_regen_interval: float = 1.0
     hp_regen_amount: int = 1
+    next_mana_regen_time: float = 0.0
     
+    # Spatial grids for projectile collision (see GRID_SHIFT)
+    enemy_grid: dict = field(default_factory=dict)     # rebuilt every combat frame
+    obstacle_grid: dict = field(default_factory=dict)  # rebuilt when obstacles change
+    obstacle_rects: List[pygame.Rect] = field(default_factory=list)  # every obstacle
+    flyer_rects: List[pygame.Rect] = field(default_factory=list)     # obstacles Imps can't fly over
+    free_cells: dict = field(default_factory=dict)  # body size -> free spawn corners, see free_spawn_cells()
+    arena_bg: Optional[pygame.Surface] = None          # floor + obstacles for the stage, see render_arena_bg()
+
     # Floating messages that follow player
     floating_messages: List[Tuple[str, float, float, float]] = field(default_factory=list)  # (text, timer, offset_x, offset_y)
 
+    def set_wave(self, wave: int):
+        self.wave = wave
+        self.is_minion_wave = wave <= MINION_WAVES_PER_STAGE
+        self.is_boss_wave = wave == MINION_WAVES_PER_STAGE + 1
+
     def message(self, txt: str, t: float = 2.0):
         self.info_message = txt
         self.info_timer = t
+
+    def banner(self, txt: str, color, t: float = 3.0):
+        """Show a big centered banner; it is rendered here, not every frame"""
+        self.current_banner = self.font_big.render(txt, True, color)
+        self.banner_timer = t
     
     def floating_message(self, txt: str, t: float = 1.5):
         """Add a floating message that follows the player"""
@@ -800,7 +1086,7 @@ class GameState:
 
     def deserialize(self, data):
         self.stage = data.get("stage", 1)
-        self.wave = data.get("wave", 1)
+        self.set_wave(data.get("wave", 1))
         self.in_safe_area = data.get("in_safe_area", False)
         self.score = data.get("score", 0)
         self.stage_start_score = data.get("stage_start_score", 0)
@@ -819,6 +1105,7 @@ class GameState:
         p = data.get("player", {})
         self.player.x = p.get("x", self.player.x)
         self.player.y = p.get("y", self.player.y)
+        self.player.sync_center()
         self.player.hp = p.get("hp", self.player.hp)
         self.player.max_hp = p.get("max_hp", self.player.max_hp)
         self.player.mana = p.get("mana", self.player.mana)
@@ -829,8 +1116,8 @@ class GameState:
         self.player.gold = p.get("gold", self.player.gold)
         self.player.exp = p.get("exp", self.player.exp)
         self.player.level = p.get("level", self.player.level)
-        self.player.weapon_id = p.get("weapon_id", self.player.weapon_id)
-        self.player.armor_id = p.get("armor_id", self.player.armor_id)
+        equip_weapon(self.player, p.get("weapon_id", self.player.weapon_id))
+        equip_armor(self.player, p.get("armor_id", self.player.armor_id))
         self.player.armor_hits_remaining = p.get("armor_hits", self.player.armor_hits_remaining)
 
 
@@ -839,7 +1126,7 @@ class GameState:
 # Spawning and waves
 # -------------------------
 
-def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Enemy:
+def spawn_minion(stage: int, obstacle_rects: List[pygame.Rect], free_cells: dict, ng_plus: int = 0) -> Enemy:
     # Use stage-specific enemies if available, otherwise fall back to default MINIONS
     enemy_list = STAGE_ENEMIES.get(stage, MINIONS)
     name, color = random.choice(enemy_list)
@@ -854,7 +1141,7 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
     if name == 'Bee':
         size = 40
         hp = int(hp * 0.8)
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.shoot_interval = 2.0
         enemy.projectile_speed = 6.0
         enemy.projectile_damage = max(2, 1 + stage)
@@ -866,16 +1153,16 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
         hp = int(hp * 0.5)
         dmg = int(dmg * 0.7)
         speed *= 1.5  # Faster than player
-        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
     elif name == 'Centipede':
         size = 32
         hp = int(hp * 1.2)
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.shoot_interval = 2.5
         enemy.projectile_speed = 5.0
         enemy.projectile_damage = max(3, 2 + stage)
         enemy.projectile_color = GREEN
-        enemy.projectile_effect = 'poison'
+        enemy.projectile_effect = EFF_POISON
         enemy.projectile_effect_value = 1.0
         enemy.projectile_effect_duration = 3.0
         enemy.projectile_pattern = 'aim'
@@ -884,10 +1171,10 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
     # Stage 2 enemies
     elif name == 'Goblin Warrior':
         size = 24
-        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
     elif name == 'Goblin Bomber':
         size = 24
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.shoot_interval = 3.0
         enemy.projectile_speed = 4.0
         enemy.projectile_damage = max(5, 3 + stage)
@@ -896,12 +1183,12 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
         return enemy
     elif name == 'Hag':
         size = 28
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.shoot_interval = 2.8
         enemy.projectile_speed = 5.5
         enemy.projectile_damage = max(2, 1 + stage)
         enemy.projectile_color = PURPLE
-        enemy.projectile_effect = 'poison'
+        enemy.projectile_effect = EFF_POISON
         enemy.projectile_effect_value = 1.0
         enemy.projectile_effect_duration = 3.0
         enemy.projectile_pattern = 'aim'
@@ -911,8 +1198,8 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
         hp = int(hp * 1.8)
         dmg = int(dmg * 1.5)
         speed *= 0.6  # Slow but powerful
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
-        enemy.on_hit_effect = 'knockback'
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
+        enemy.on_hit_effect = EFF_KNOCKBACK
         enemy.on_hit_effect_value = 125.0  # Knockback range
         return enemy
     
@@ -921,18 +1208,18 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
         size = 18
         hp = 1  # Dies in one hit
         speed *= 1.8
-        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
     elif name == 'Thrall':
         size = 26
         hp = int(hp * 0.8)
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
-        enemy.on_hit_effect = 'bleed'
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
+        enemy.on_hit_effect = EFF_BLEED
         enemy.on_hit_effect_value = 0.5
         enemy.on_hit_effect_duration = 2.0
         return enemy
     elif name == 'Ghoul':
         size = 28
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.data['ghoul_buff'] = True  # Special ghoul buffing behavior
         return enemy
     
@@ -941,16 +1228,16 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
         size = 30
         hp = int(hp * 1.3)
         speed *= 0.8
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
-        enemy.on_hit_effect = 'slow'
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
+        enemy.on_hit_effect = EFF_SLOW
         enemy.on_hit_effect_duration = 2.0
         return enemy
     elif name == 'Skeleton Warrior':
         size = 26
-        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
     elif name == 'Skeleton Archer':
         size = 26
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.shoot_interval = 2.2
         enemy.projectile_speed = 7.0
         enemy.projectile_damage = max(3, 2 + stage)
@@ -962,17 +1249,17 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
     elif name == 'Lava Slime':
         size = 24
         speed *= 0.5  # Very slow
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.data['lava_trail'] = True  # Leaves lava trails
         return enemy
     elif name == 'Salamander':
         size = 30
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.shoot_interval = 2.0
         enemy.projectile_speed = 6.0
         enemy.projectile_damage = max(4, 3 + stage)
         enemy.projectile_color = ORANGE
-        enemy.projectile_effect = 'burn'
+        enemy.projectile_effect = EFF_BURN
         enemy.projectile_effect_value = 1.0
         enemy.projectile_effect_duration = 5.0
         enemy.projectile_pattern = 'breath'
@@ -981,8 +1268,8 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
         size = 32
         hp = int(hp * 1.4)
         speed *= 0.7
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
-        enemy.on_hit_effect = 'burn'
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
+        enemy.on_hit_effect = EFF_BURN
         enemy.on_hit_effect_value = 1.0
         enemy.on_hit_effect_duration = 5.0
         return enemy
@@ -990,7 +1277,7 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
     # Stage 7 enemies
     elif name == 'Undead Mage':
         size = 28
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.shoot_interval = 2.5
         enemy.projectile_speed = 6.5
         enemy.projectile_damage = max(4, 3 + stage)
@@ -1002,22 +1289,22 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
     elif name == 'Wolf':
         size = 24
         speed *= 1.3
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.data['flee_when_weak'] = True
         return enemy
     elif name == 'Werewolf':
         size = 30
         hp = int(hp * 1.2)
         dmg = int(dmg * 1.1)
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
-        enemy.on_hit_effect = 'trauma'  # Slow + bleed chance
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
+        enemy.on_hit_effect = EFF_TRAUMA  # Slow + bleed chance
         enemy.on_hit_effect_value = 0.5  # 50% chance
         enemy.on_hit_effect_duration = 3.0
         return enemy
     elif name == 'Dire Wolf':
         size = 26
         speed *= 1.2
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.data['flee_when_weak'] = True
         return enemy
     
@@ -1026,7 +1313,7 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
         size = 36
         hp = int(hp * 1.5)
         dmg = int(dmg * 1.3)
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.shoot_interval = 1.8
         enemy.projectile_speed = 6.5
         enemy.projectile_damage = max(5, 4 + stage)
@@ -1039,9 +1326,9 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
         speed *= 2.0
         dmg = int(dmg * 1.5)
         hp *= 2
-        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
     elif name == 'Imp':
-        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        enemy = create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
         enemy.shoot_interval = 1.8
         enemy.projectile_speed = 8.0
         enemy.projectile_damage = max(3, 2 + stage)
@@ -1052,19 +1339,19 @@ def spawn_minion(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> E
         return enemy
     else:
         # Default skeleton or other
-        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus)
+        return create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus)
 
-def create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacles, ng_plus):
+def create_enemy_with_stats(name, color, size, hp, dmg, speed, obstacle_rects, free_cells, ng_plus):
     """Helper function to create enemy with NG+ scaling"""
     if ng_plus > 0:
         hp = int(hp * (2 ** ng_plus))
         dmg = int(dmg * (2 ** ng_plus))
     
-    x, y = random_free_spot(size, obstacles)
+    x, y = random_free_spot(size, obstacle_rects, free_cells)
     return Enemy(x=x, y=y, w=size, h=size, hp=hp, max_hp=hp, color=color, name=name, speed=speed, damage=dmg)
 
 
-def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> List[Enemy]:
+def spawn_boss(stage: int, obstacle_rects: List[pygame.Rect], free_cells: dict, ng_plus: int = 0) -> List[Enemy]:
     if stage == SECRET_BOSS_STAGE:
         name, color = SECRET_BOSS
         size = 40
@@ -1079,7 +1366,7 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
             hp = int(hp * (2 ** ng_plus))
             dmg = int(dmg * (2 ** ng_plus))
         
-        x, y = random_free_spot(size, obstacles)
+        x, y = random_free_spot(size, obstacle_rects, free_cells)
         queen = Enemy(x=x, y=y, w=size, h=size, hp=hp, max_hp=hp, color=color, name=name, speed=speed, damage=dmg)
         # Demon Queen: summons allies and must be finished by sword (tracked via data)
         queen.shoot_interval = 2.8
@@ -1090,8 +1377,8 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
             queen.projectile_damage = int(queen.projectile_damage * (2 ** ng_plus))
         queen.projectile_color = PURPLE
         queen.projectile_pattern = 'aim'
-        queen.data['summon_thresholds'] = {0.8: False, 0.6: False, 0.4: False, 0.2: False}
-        queen.data['must_die_by_sword'] = True
+        queen.summon_thresholds = [0.8, 0.6, 0.4, 0.2]
+        queen.must_die_by_sword = True
         queen.data['revive_once'] = False
         return [queen]
     idx = min(stage-1, len(BOSS_LIST)-1)
@@ -1113,7 +1400,7 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
         base_hp = int(base_hp * (2 ** ng_plus))
         base_dmg = int(base_dmg * (2 ** ng_plus))
     
-    x, y = random_free_spot(size, obstacles)
+    x, y = random_free_spot(size, obstacle_rects, free_cells)
     e = Enemy(x=x, y=y, w=size, h=size, hp=base_hp, max_hp=base_hp, color=color, name=name, speed=base_speed, damage=base_dmg)
     # Configure boss behaviors
     if name == "Ba'al (The Insect King)":  # Boss 1: shoot stingers
@@ -1124,7 +1411,7 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
             e.projectile_damage = int(e.projectile_damage * (2 ** ng_plus))
         e.projectile_color = ORANGE
         e.projectile_pattern = 'aim'
-        e.data['summon_thresholds'] = {0.7: False, 0.4: False}
+        e.summon_thresholds = [0.7, 0.4]
     elif name == "Trefyr Herahid (The Dark Elf)":  # Boss 2: shoot arrows
         e.shoot_interval = 1.2
         e.projectile_speed = 8.0
@@ -1133,17 +1420,17 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
             e.projectile_damage = int(e.projectile_damage * (2 ** ng_plus))
         e.projectile_color = YELLOW
         e.projectile_pattern = 'aim'
-        e.data['summon_thresholds'] = {0.6: False, 0.3: False}
+        e.summon_thresholds = [0.6, 0.3]
     elif name == "Viscardi (Vampire Lord)":  # Boss 3: cause bleed -2 dps for 10s on hit
-        e.on_hit_effect = 'bleed'
+        e.on_hit_effect = EFF_BLEED
         e.on_hit_effect_value = 2.0
         if ng_plus > 0:
             e.on_hit_effect_value = e.on_hit_effect_value * (2 ** ng_plus)
         e.on_hit_effect_duration = 10.0
-        e.data['summon_thresholds'] = {0.5: False, 0.2: False}
+        e.summon_thresholds = [0.5, 0.2]
     elif name == "Rox and Tox":  # Boss 4: twin buff on death
         e.data['twin_buff_on_death'] = True
-        e.data['summon_thresholds'] = {0.6: False, 0.3: False}
+        e.summon_thresholds = [0.6, 0.3]
     elif name == "Thilreriltic (Lesser Demon Prince)":  # Boss 5: shoots fireballs in 8 directions until dead, heals to 80%
         e.shoot_interval = 1.5
         e.projectile_speed = 6.0
@@ -1152,8 +1439,8 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
             e.projectile_damage = int(e.projectile_damage * (2 ** ng_plus))
         e.projectile_color = ORANGE
         e.projectile_pattern = 'cross8'  # 8 directions
-        e.data['heal_to_80_percent'] = True
-        e.data['summon_thresholds'] = {0.7: False, 0.4: False}
+        e.heal_to_80_percent = True
+        e.summon_thresholds = [0.7, 0.4]
     elif name == "Gorzak (Fire Giant Mage)":  # Boss 6: big fireballs; sword causes burn (no heal 10s)
         e.shoot_interval = 2.4
         e.projectile_speed = 5.0
@@ -1163,9 +1450,9 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
         e.projectile_color = ORANGE
         e.projectile_radius = MAGIC_RADIUS + 4
         e.projectile_pattern = 'aim'
-        e.on_hit_effect = 'no_heal'
+        e.on_hit_effect = EFF_NO_HEAL
         e.on_hit_effect_duration = 10.0
-        e.data['summon_thresholds'] = {0.6: False, 0.3: False}
+        e.summon_thresholds = [0.6, 0.3]
     elif name == "Dram'zuku (The Undead King)":  # Boss 7: fireball and self-heal if not attacked 3s
         e.shoot_interval = 1.8
         e.projectile_speed = 6.0
@@ -1179,10 +1466,10 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
         e.heal_per_sec = 6.0
         if ng_plus > 0:
             e.heal_per_sec = e.heal_per_sec * (2 ** ng_plus)
-        e.data['summon_thresholds'] = {0.5: False, 0.2: False}
+        e.summon_thresholds = [0.5, 0.2]
     elif name == "Alhazred (Pack Leader)":  # Boss 8: speed doubles at 50%
         e.speed_doubles_at_half = True
-        e.data['summon_thresholds'] = {0.6: False, 0.3: False}
+        e.summon_thresholds = [0.6, 0.3]
     elif name == "Noaghoirth, Destroyer of Men":  # Boss 9: fire breath
         e.shoot_interval = 0.25
         e.projectile_speed = 7.0
@@ -1191,22 +1478,23 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
             e.projectile_damage = int(e.projectile_damage * (2 ** ng_plus))
         e.projectile_color = ORANGE
         e.projectile_pattern = 'breath'
-        e.data['summon_thresholds'] = {0.7: False, 0.4: False}
+        e.summon_thresholds = [0.7, 0.4]
     elif name == "Zasu (Demon King)":  # Boss 10: summon allies at 80/60/40/20 and revive once
-        e.data['summon_thresholds'] = {0.8: False, 0.6: False, 0.4: False, 0.2: False}
+        e.summon_thresholds = [0.8, 0.6, 0.4, 0.2]
         e.revived_once = False
     enemies = [e]
     if name == "Rox and Tox":
         # Rox is the bigger twin (already created as 'e')
         e.name = "Rox (Big Twin)"
         # add Tox, the smaller twin
-        x2, y2 = random_free_spot(size-10, obstacles)
+        x2, y2 = random_free_spot(size-10, obstacle_rects, free_cells)
         twin_hp = base_hp - 80
         twin_dmg = base_dmg - 2
         # Note: base_hp and base_dmg already have NG+ scaling applied above
         e2 = Enemy(x=x2, y=y2, w=size-10, h=size-10, hp=twin_hp, max_hp=twin_hp, color=color, name="Tox (Small Twin)", speed=base_speed+0.2, damage=twin_dmg)
         e2.data['twin_buff_on_death'] = True
-        e2.data['summon_thresholds'] = {0.6: False, 0.3: False}
+        e2.summon_thresholds = [0.6, 0.3]
+        e.twin, e2.twin = e2, e
         enemies.append(e2)
     return enemies
 
@@ -1214,6 +1502,32 @@ def spawn_boss(stage: int, obstacles: List["Obstacle"], ng_plus: int = 0) -> Lis
 # Combat and collisions
 # -------------------------
 
+def _apply_no_effect(p: Player, value: float, duration: float):
+    pass
+
+
+def _apply_bleed(p: Player, value: float, duration: float):
+    p.bleed_time_left = max(p.bleed_time_left, duration)
+    p.bleed_dps = max(p.bleed_dps, value)
+
+
+def _apply_no_heal(p: Player, value: float, duration: float):
+    p.no_heal_time_left = max(p.no_heal_time_left, duration)
+
+
+# Indexed by EFF_* code; effects without player-side behaviour yet are no-ops
+EFFECT_APPLIERS = (
+    _apply_no_effect,  # EFF_NONE
+    _apply_bleed,      # EFF_BLEED
+    _apply_no_heal,    # EFF_NO_HEAL
+    _apply_no_effect,  # EFF_POISON
+    _apply_no_effect,  # EFF_BURN
+    _apply_no_effect,  # EFF_SLOW
+    _apply_no_effect,  # EFF_KNOCKBACK
+    _apply_no_effect,  # EFF_TRAUMA
+)
+
+
 def entity_hit_player(e: Enemy, p: Player, dt):
     if e.hp <= 0:
         return
@@ -1227,111 +1541,206 @@ def entity_hit_player(e: Enemy, p: Player, dt):
             p.hp -= e.damage
         p.invuln_timer = INVULN_TIME
         # Apply on-hit status effects from enemy (e.g., bleed, no-heal burn)
-        if e.on_hit_effect == 'bleed':
-            p.bleed_time_left = max(p.bleed_time_left, e.on_hit_effect_duration)
-            p.bleed_dps = max(p.bleed_dps, e.on_hit_effect_value)
-        if e.on_hit_effect == 'no_heal':
-            p.no_heal_time_left = max(p.no_heal_time_left, e.on_hit_effect_duration)
+        EFFECT_APPLIERS[e.on_hit_effect](p, e.on_hit_effect_value, e.on_hit_effect_duration)
+
+
+def spawn_projectile(state: GameState, x, y, vx, vy, damage, color, radius=MAGIC_RADIUS, from_player=True,
+                     effect=EFF_NONE, effect_value=0.0, effect_duration=0.0):
+    """Fire a projectile, reusing a spent one from the pool when available"""
+    if state.projectile_pool:
+        pr = state.projectile_pool.pop()
+        pr.reset(x, y, vx, vy, damage, color, radius, from_player, effect, effect_value, effect_duration)
+    else:
+        pr = Projectile(x, y, vx, vy, damage, color, radius, from_player, effect, effect_value, effect_duration)
+    state.projectiles.append(pr)
 
 
-def projectile_hits(enemies: List[Enemy], projs: List[Projectile], player: Player, obstacles: List["Obstacle"]):
-    remove = []
+# Scratch AABB reused by projectile_hits() for obstacle tests
+_PROJ_AABB = pygame.Rect(0, 0, 0, 0)
+
+
+def projectile_hits(projs: List[Projectile], player: Player, enemy_grid: dict, obstacle_grid: dict, now: float,
+                    pool: List[Projectile]):
+    alive = [True] * len(projs)
+    # The player doesn't move during this pass: take its bounds once for enemy shots
+    p_rect = player.rect()
+    px0, py0, px1, py1 = p_rect.left, p_rect.top, p_rect.right, p_rect.bottom
     for i, pr in enumerate(projs):
-        pr.update()
-        # obstacle collision
-        if collides_rect(pygame.Rect(int(pr.x - pr.radius), int(pr.y - pr.radius), pr.radius*2, pr.radius*2), obstacles):
-            remove.append(i)
+        # Advance inline and cull off-screen projectiles before any Rect work
+        pr.x += pr.vx
+        pr.y += pr.vy
+        pr.ticks_left -= 1
+        if pr.ticks_left <= 0:
+            alive[i] = False
             continue
-        if pr.x < 0 or pr.x > WIDTH or pr.y < 0 or pr.y > HEIGHT:
-            remove.append(i)
+        # obstacle collision (only obstacles sharing a grid cell with the projectile)
+        pr_rect = _PROJ_AABB
+        pr_rect.x = int(pr.x - pr.radius)
+        pr_rect.y = int(pr.y - pr.radius)
+        pr_rect.w = pr_rect.h = pr.radius * 2
+        blocked = False
+        for gx in range(pr_rect.left >> GRID_SHIFT, ((pr_rect.right - 1) >> GRID_SHIFT) + 1):
+            for gy in range(pr_rect.top >> GRID_SHIFT, ((pr_rect.bottom - 1) >> GRID_SHIFT) + 1):
+                cell = obstacle_grid.get((gx, gy))
+                if cell and collides_rect(pr_rect, cell):
+                    blocked = True
+                    break
+            if blocked:
+                break
+        if blocked:
+            alive[i] = False
             continue
         if pr.from_player:
-            for e in enemies:
-                if e.hp <= 0: continue
-                if e.rect().collidepoint(pr.pos()):
-                    e.hp -= pr.damage
-                    e.invuln_timer = INVULN_TIME
-                    # Mark last hit time
-                    if hasattr(e, 'last_hit_time'):
-                        e.last_hit_time = time.time()
-                    if hasattr(e, 'data'):
-                        e.data['last_hit_by_sword'] = False
-                    remove.append(i)
+            pos = pr.pos()
+            gx, gy = pos[0] >> GRID_SHIFT, pos[1] >> GRID_SHIFT
+            hit = False
+            for key in ((gx, gy), (gx - 1, gy), (gx, gy - 1), (gx - 1, gy - 1)):
+                cell = enemy_grid.get(key)
+                if not cell:
+                    continue
+                for e in cell:
+                    if e.hp <= 0: continue
+                    if e.rect().collidepoint(pos):
+                        e.hp -= pr.damage
+                        e.invuln_timer = INVULN_TIME
+                        # Mark last hit time
+                        e.last_hit_time = now
+                        e.last_hit_by_sword = False
+                        alive[i] = False
+                        hit = True
+                        break
+                if hit:
                     break
         else:
-            # Check collision with player
-            if player.rect().collidepoint(pr.pos()) and player.invuln_timer <= 0:
+            # Check collision with player (same test as Rect.collidepoint)
+            x, y = int(pr.x), int(pr.y)
+            if px0 <= x < px1 and py0 <= y < py1 and player.invuln_timer <= 0:
                 player.hp -= pr.damage
                 player.invuln_timer = INVULN_TIME
                 # Apply projectile effects to player
-                if pr.effect == 'bleed':
-                    player.bleed_time_left = max(player.bleed_time_left, pr.effect_duration)
-                    player.bleed_dps = max(player.bleed_dps, pr.effect_value)
-                elif pr.effect == 'no_heal':
-                    player.no_heal_time_left = max(player.no_heal_time_left, pr.effect_duration)
-                remove.append(i)
-    for i in reversed(sorted(set(remove))):
-        del projs[i]
+                EFFECT_APPLIERS[pr.effect](player, pr.effect_value, pr.effect_duration)
+                alive[i] = False
+    if False in alive:
+        pool.extend(pr for pr, keep in zip(projs, alive) if not keep)
+        projs[:] = [pr for pr, keep in zip(projs, alive) if keep]
 
 # -------------------------
 # XP / Gold / Level up / Shop
 # -------------------------
 
-def drop_rewards(state: GameState, is_boss: bool, stage: int, boss_name: str = None):
-    px, py = state.player.center()
-    x = int(px + random.randint(-40, 40))
-    y = int(py + random.randint(-40, 40))
+# Reward rolls per (is_boss, stage, boss_name):
+# (gold_min, gold_span, exp_min, exp_span, heal_chance), spans inclusive of both ends
+_LOOT_TABLES = {}
+
+def loot_entry(is_boss: bool, stage: int, boss_name: str = None) -> tuple:
+    """Resolve the reward ranges for a kill once; later kills reuse the cached entry"""
+    key = (is_boss, stage, boss_name)
+    entry = _LOOT_TABLES.get(key)
+    if entry is not None:
+        return entry
     if is_boss:
         # Use individual boss rewards if boss name is provided
         if boss_name and boss_name in BOSS_REWARDS:
             rewards = BOSS_REWARDS[boss_name]
-            exp = random.randint(*rewards["exp"])
-            gold = random.randint(*rewards["gold"])
+            exp_range, gold_range = rewards["exp"], rewards["gold"]
         else:
             # Fallback to old system if boss name not found - Gold reduced by 25%
             if stage <= 5:
-                gold = random.randint(14, 30)  # Reduced from (18, 40)
-                exp = random.randint(13, 33)
+                gold_range, exp_range = (14, 30), (13, 33)  # Gold reduced from (18, 40)
             elif stage <= 10:
-                gold = random.randint(34, 51)  # Reduced from (45, 68)
-                exp = random.randint(35, 55)
+                gold_range, exp_range = (34, 51), (35, 55)  # Gold reduced from (45, 68)
             else:
-                exp = random.randint(65, 80)
-                gold = random.randint(60, 83)  # Reduced from (80, 110)
-        drop_health = random.random() < HEALTH_DROP_CHANCE_BOSS
+                gold_range, exp_range = (60, 83), (65, 80)  # Gold reduced from (80, 110)
+        heal_chance = HEALTH_DROP_CHANCE_BOSS
     else:
         # Use bonus stage rewards for minions
         if stage <= 5:
-            gold = random.randint(*BONUS_STAGE_1_5_GOLD)
-            exp = random.randint(*BONUS_STAGE_1_5_EXP)
+            gold_range, exp_range = BONUS_STAGE_1_5_GOLD, BONUS_STAGE_1_5_EXP
         else:
-            gold = random.randint(*BONUS_STAGE_6_10_GOLD)
-            exp = random.randint(*BONUS_STAGE_6_10_EXP)
-        drop_health = random.random() < HEALTH_DROP_CHANCE_MINION
+            gold_range, exp_range = BONUS_STAGE_6_10_GOLD, BONUS_STAGE_6_10_EXP
+        heal_chance = HEALTH_DROP_CHANCE_MINION
+    entry = _LOOT_TABLES[key] = (gold_range[0], gold_range[1] - gold_range[0] + 1,
+                                 exp_range[0], exp_range[1] - exp_range[0] + 1, heal_chance)
+    return entry
+
+def drop_rewards(state: GameState, is_boss: bool, stage: int, boss_name: str = None):
+    gold_min, gold_span, exp_min, exp_span, heal_chance = loot_entry(is_boss, stage, boss_name)
+    # random() scaled into each range draws the same integers as randint, without its Python overhead
+    rand = random.random
+    px, py = state.player.cx, state.player.cy
+    x = int(px + int(rand() * 81) - 40)
+    y = int(py + int(rand() * 81) - 40)
+    gold = gold_min + int(rand() * gold_span)
+    exp = exp_min + int(rand() * exp_span)
     # store pickups: gold, exp, optional heal
-    state.drops.append((x, y, 'gold', gold))
-    state.drops.append((x+10, y, 'exp', exp))
-    if drop_health:
+    state.drops.append((x, y, DROP_GOLD, gold))
+    state.drops.append((x+10, y, DROP_EXP, exp))
+    if rand() < heal_chance:
         heal_amt = random.randint(*HEALTH_DROP_AMOUNT_RANGE)
-        state.drops.append((x+5, y-12, 'heal', heal_amt))
+        state.drops.append((x+5, y-12, DROP_HEAL, heal_amt))
 
 
+# Minion death sounds by enemy name (keys into state.sounds); bosses use boss_explode
+DEATH_SOUND_KEYS = {
+    "Imp": "imp_die",
+    "Skeleton": "undead_die",
+    "Undead Lich": "undead_die",
+}
+
+def bind_death_sounds(state: GameState, enemies: List[Enemy]):
+    """Resolve each enemy's death sound once at spawn instead of on every kill"""
+    for e in enemies:
+        key = DEATH_SOUND_KEYS.get(e.name)
+        if key:
+            e.death_sound = state.sounds.get(key)
+
+
+def handle_enemy_deaths(state: GameState, deaths: List[Enemy]):
+    """Apply twin buffs, rewards, score and death sounds for enemies killed this frame"""
+    # drop rewards
+    is_boss = state.is_boss_wave
+    for e in deaths:
+        # Twin Ghouls: buff twin on death
+        twin = e.twin
+        if twin is not None and twin.hp > 0:
+            twin.damage = int(twin.damage * e.twin_buff)
+        # Only drop boss rewards when boss is actually killed
+        if is_boss:
+            drop_rewards(state, True, state.stage, e.name)
+        else:
+            drop_rewards(state, False, state.stage)
+        # Score for kill and death sounds
+        state.score += 10 if is_boss else 3
+        play_sound(state.snd_boss_explode if is_boss else e.death_sound)
+
+
+# EXP needed per level: 20, doubling every 5 levels
+EXP_TABLE = tuple(20 * (1 << (i // 5)) for i in range(256))
+
 def get_exp_needed_for_level(level: int) -> int:
     """Calculate EXP needed for next level. Doubles every 5 levels."""
-    base_exp = 20
+    if 0 <= level < len(EXP_TABLE):
+        return EXP_TABLE[level]
     # Every 5 levels, double the requirement
-    multiplier = 2 ** (level // 5)
-    return base_exp * multiplier
+    return 20 * 2 ** (level // 5)
 
 def check_pickups(state: GameState):
     p = state.player
-    new = []
-    for (x, y, kind, amount) in state.drops:
-        if pygame.Rect(x-6, y-6, 12, 12).colliderect(p.rect()):
-            if kind == 'gold':
+    # A drop's 12x12 box overlaps the player rect iff its center lies
+    # strictly inside the player rect grown by 6px on every side
+    pr = p.rect()
+    x0, x1 = pr.left - 6, pr.right + 6
+    y0, y1 = pr.top - 6, pr.bottom + 6
+    # Compact uncollected drops in place; no new list per frame
+    drops = state.drops
+    w = 0
+    for item in drops:
+        x, y, kind, amount = item
+        if x0 < x < x1 and y0 < y < y1:
+            if kind == DROP_GOLD:
                 p.gold += amount
                 state.floating_message(f"+{amount} gold")
-            elif kind == 'exp':
+            elif kind == DROP_EXP:
                 p.exp += amount
                 state.floating_message(f"+{amount} exp")
                 # Level up with scaling EXP requirements - automatic stat increases
@@ -1340,20 +1749,20 @@ def check_pickups(state: GameState):
                     p.exp -= exp_needed
                     p.level += 1
                     # Automatic stat increase in sequence: Attack → Magic → Health → Mana
-                    stat_cycle = ["Attack", "Magic", "Health", "Mana"]
-                    stat_to_increase = stat_cycle[(p.level - 1) % 4]
+                    stat_to_increase = LEVEL_UP_CYCLE[(p.level - 1) % 4]
                     apply_levelup_choice(p, stat_to_increase)
                     state.floating_message(f"Level {p.level}! +{stat_to_increase}")
                     exp_needed = get_exp_needed_for_level(p.level)
-            elif kind == 'heal':
+            elif kind == DROP_HEAL:
                 old = p.hp
                 p.hp = min(p.max_hp, p.hp + amount)
                 healed = p.hp - old
                 if healed > 0:
                     state.message(f"+{healed} HP")
             continue
-        new.append((x, y, kind, amount))
-    state.drops = new
+        drops[w] = item
+        w += 1
+    del drops[w:]
 
 
 def apply_levelup_choice(player: Player, choice: str):
@@ -1376,8 +1785,7 @@ def apply_levelup_choice(player: Player, choice: str):
 def replenish_armor(player: Player):
     """Replenish armor hits to full if player has armor equipped"""
     if player.armor_id != "none":
-        armor = get_armor(player)
-        player.armor_hits_remaining = armor["hits"]
+        player.armor_hits_remaining = player.max_armor_hits
 
 def has_god_equipment(player: Player):
     """Check if player has both god sword and god armor"""
@@ -1386,20 +1794,33 @@ def has_god_equipment(player: Player):
 def in_safe_area_setup(state: GameState):
     state.in_safe_area = True
     state.enemies.clear()
+    state.projectile_pool.extend(state.projectiles)
     state.projectiles.clear()
-    state.wave = 0
+    state.set_wave(0)
     state.player.x, state.player.y = WIDTH//2 - 16, HEIGHT - 120
+    state.player.sync_center()
+    state.current_banner = None
+    state.full_redraw = True
     # Replenish armor when entering safe area (before boss levels)
     replenish_armor(state.player)
 
 
+def prepare_arena(state: GameState, obstacles: List["Obstacle"]):
+    """Rebuild the per-stage obstacle caches (collision grid and pre-rendered background)"""
+    state.obstacle_grid = build_obstacle_grid(obstacles)
+    state.obstacle_rects = [ob._rect for ob in obstacles]
+    state.flyer_rects = [ob._rect for ob in obstacles if ob.kind not in FLYER_PASSABLE_KINDS]
+    state.free_cells = {}
+    state.arena_bg = render_arena_bg(obstacles)
+    state.full_redraw = True
+
+
 def leave_safe_area(state: GameState):
     state.in_safe_area = False
-    state.wave = 1
+    state.set_wave(1)
     state.enemies = []
     # start wave spawn after short cooldown
-    state.wave_cooldown = 0.5
-    state.pending_spawn = True
+    state.next_spawn_time = state.game_clock + 0.5
 
 
 def try_buy_weapon(player: Player, key: str) -> bool:
@@ -1410,7 +1831,7 @@ def try_buy_weapon(player: Player, key: str) -> bool:
         return False
     # Purchase: replace current weapon
     player.gold -= w["price"]
-    player.weapon_id = key
+    equip_weapon(player, key)
     return True
 
 
@@ -1422,69 +1843,133 @@ def try_buy_armor(player: Player, key: str) -> bool:
         return False
     # Purchase: replace and reset armor hits
     player.gold -= a["price"]
-    player.armor_id = key
-    player.armor_hits_remaining = a["hits"]
+    equip_armor(player, key)
+    player.armor_hits_remaining = player.max_armor_hits
     return True
 
 # -------------------------
 # Rendering
 # -------------------------
 
-def draw_player(surface, p: Player):
-    pygame.draw.rect(surface, p.color, p.rect())
+TEXT_CACHE_MAX = 256
+_FONTS = {}
+
+def get_font(name: str, size: int, bold: bool = False) -> pygame.font.Font:
+    """SysFont lookup cached per (name, size, bold); SysFont scans system fonts"""
+    key = (name, size, bold)
+    font = _FONTS.get(key)
+    if font is None:
+        font = _FONTS[key] = pygame.font.SysFont(name, size, bold=bold)
+    return font
+
+def render_text(state: GameState, font, text: str, color) -> pygame.Surface:
+    """Font.render through state.text_cache, evicting least recently used text"""
+    cache = state.text_cache
+    key = (font, text, color)
+    surf = cache.get(key)
+    if surf is None:
+        surf = cache[key] = font.render(text, True, color)
+        if len(cache) > TEXT_CACHE_MAX:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return surf
+
+def draw_player(surface, p: Player) -> pygame.Rect:
+    body = pygame.draw.rect(surface, p.color, p.rect())
     # simple sword indicator
-    pygame.draw.circle(surface, YELLOW, (int(p.x + p.w/2), int(p.y)), 4)
+    sword = pygame.draw.circle(surface, YELLOW, (int(p.x + p.w/2), int(p.y)), 4)
     # armor outline effect if armor equipped
     if p.armor_id != "none":
         pygame.draw.rect(surface, (200, 200, 255), p.rect(), 2)
-
-
-def draw_enemy(surface, e: Enemy, state=None):
-    # Use sprites if available
-    if e.name == "Imp" and state and state.imp_sprites:
+    return body.union(sword)
+
+
+# Boss names drawn above their HP bar
+BOSS_NAMES = frozenset({
+    "Ba'al (The Insect King)", "Trefyr Herahid (The Dark Elf)", "Viscardi (Vampire Lord)", "Rox (Big Twin)",
+    "Tox (Small Twin)", "Thilreriltic (Lesser Demon Prince)", "Gorzak (Fire Giant Mage)",
+    "Dram'zuku (The Undead King)", "Alhazred (Pack Leader)", "Noaghoirth, Destroyer of Men",
+    "Zasu (Demon King)", "Shyssa (Demon Queen)",
+})
+
+# Enemy body and HP bar surfaces keyed by (w, h, color) and (w, fill_w)
+_BODY_SURFS = {}
+_ENEMY_BARS = {}
+
+def _enemy_bar(w: int, ratio: float) -> pygame.Surface:
+    """6px enemy HP bar as drawn by draw_bar, cached per filled width"""
+    fill_w = int(w * max(0, min(1, ratio)))
+    key = (w, fill_w)
+    bar = _ENEMY_BARS.get(key)
+    if bar is None:
+        bar = pygame.Surface((w, 6)).convert()
+        draw_bar(bar, 0, 0, w, 6, ratio, RED)
+        _ENEMY_BARS[key] = bar
+    return bar
+
+def _enemy_frames(e: Enemy, state: GameState) -> tuple:
+    """Pick an enemy's images once: loaded sprites if available, else a plain colored body"""
+    if e.name == "Imp" and state.imp_sprites:
         # Animate between the two sprites (switch every 0.5 seconds)
-        sprite_index = int(e.anim_timer * 2) % len(state.imp_sprites)
-        sprite = state.imp_sprites[sprite_index]
-        surface.blit(sprite, (e.x, e.y))
-    elif e.name == "Bee" and state and state.bee_sprites:
-        # Use bee sprite
-        sprite = state.bee_sprites[0]
-        surface.blit(sprite, (e.x, e.y))
-    elif e.name == "Fly" and state and state.fly_sprites:
-        # Use fly sprite
-        sprite = state.fly_sprites[0]
-        surface.blit(sprite, (e.x, e.y))
-    else:
-        # Default rectangle drawing for other enemies
-        pygame.draw.rect(surface, e.color, e.rect())
-    
-    # HP bar
-    ratio = e.hp / max(1, e.max_hp)
-    draw_bar(surface, e.x, e.y - 8, e.w, 6, ratio, RED)
-    
-    # Display boss name above boss enemies
-    boss_names = ["Ba'al (The Insect King)", "Trefyr Herahid (The Dark Elf)", "Viscardi (Vampire Lord)", "Rox (Big Twin)", "Tox (Small Twin)", "Thilreriltic (Lesser Demon Prince)", 
-                  "Gorzak (Fire Giant Mage)", "Dram'zuku (The Undead King)", "Alhazred (Pack Leader)", "Noaghoirth, Destroyer of Men", 
-                  "Zasu (Demon King)", "Shyssa (Demon Queen)"]
-    if e.name in boss_names:
-        font = pygame.font.SysFont("Arial", 16, bold=True)
-        name_surface = font.render(e.name, True, WHITE)
-        name_x = e.x + e.w//2 - name_surface.get_width()//2
-        name_y = e.y - 30
-        surface.blit(name_surface, (name_x, name_y))
-
-
-def draw_pickups(surface, drops):
-    for (x, y, kind, amount) in drops:
-        if kind == 'gold':
-            c = YELLOW
-        elif kind == 'exp':
-            c = PURPLE
-        elif kind == 'heal':
-            c = GREEN
+        return tuple(state.imp_sprites)
+    if e.name == "Bee" and state.bee_sprites:
+        return (state.bee_sprites[0],)
+    if e.name == "Fly" and state.fly_sprites:
+        return (state.fly_sprites[0],)
+    key = (e.w, e.h, e.color)
+    body = _BODY_SURFS.get(key)
+    if body is None:
+        body = _BODY_SURFS[key] = pygame.Surface((e.w, e.h)).convert()
+        body.fill(e.color)
+    return (body,)
+
+def draw_enemies(surface, enemies: List[Enemy], state: GameState) -> List[pygame.Rect]:
+    """Draw all enemies, their HP bars and boss names with one blits() call"""
+    draws = []
+    add = draws.append
+    font = get_font("Arial", 16, bold=True)
+    for e in enemies:
+        frames = e.frames
+        if not frames:
+            frames = e.frames = _enemy_frames(e, state)
+            e.shows_name = e.name in BOSS_NAMES
+        if len(frames) == 1:
+            add((frames[0], (e.x, e.y)))
         else:
-            c = WHITE
-        pygame.draw.circle(surface, c, (x, y), 6)
+            add((frames[int(e.anim_timer * 2) % len(frames)], (e.x, e.y)))
+        # HP bar
+        add((_enemy_bar(e.w, e.hp / max(1, e.max_hp)), (e.x, e.y - 8)))
+        # Display boss name above boss enemies
+        if e.shows_name:
+            name_surface = render_text(state, font, e.name, WHITE)
+            add((name_surface, (e.x + e.w//2 - name_surface.get_width()//2, e.y - 30)))
+    return surface.blits(draws)
+
+
+# Projectile and pickup circles pre-rendered per (color, radius)
+_CIRCLE_SPRITES = {}
+
+def circle_sprite(color, radius: int) -> pygame.Surface:
+    key = (color, radius)
+    sprite = _CIRCLE_SPRITES.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        sprite = _CIRCLE_SPRITES[key] = sprite.convert_alpha()
+    return sprite
+
+def draw_projectiles(surface, projs: List[Projectile]) -> List[pygame.Rect]:
+    """Blit every projectile from the sprite cache in one blits() call"""
+    return surface.blits([(circle_sprite(pr.color, pr.radius), pr.pos_topleft()) for pr in projs])
+
+
+# Pickup colors indexed by DROP_* code
+_PICKUP_COLORS = (YELLOW, PURPLE, GREEN)
+
+def draw_pickups(surface, drops) -> List[pygame.Rect]:
+    sprites = [circle_sprite(color, 6) for color in _PICKUP_COLORS]
+    return surface.blits([(sprites[kind], (x - 6, y - 6)) for (x, y, kind, amount) in drops])
 
 
 def draw_status_effect_icons(surface, player: Player, x_start, y_start):
@@ -1492,6 +1977,8 @@ def draw_status_effect_icons(surface, player: Player, x_start, y_start):
     icon_size = 24
     icon_spacing = 30
     current_x = x_start
+    if player.bleed_time_left <= 0 and player.no_heal_time_left <= 0 and player.invuln_timer <= 0:
+        return
     
     # Bleeding effect - Red droplet icon
     if player.bleed_time_left > 0:
@@ -1499,7 +1986,7 @@ def draw_status_effect_icons(surface, player: Player, x_start, y_start):
         pygame.draw.circle(surface, (200, 0, 0), (current_x + icon_size//2, y_start + icon_size//2), icon_size//2)
         pygame.draw.circle(surface, (100, 0, 0), (current_x + icon_size//2, y_start + icon_size//2), icon_size//3)
         # Add timer text below
-        timer_text = pygame.font.SysFont("Arial", 12).render(f"{player.bleed_time_left:.1f}s", True, WHITE)
+        timer_text = get_font("Arial", 12).render(f"{player.bleed_time_left:.1f}s", True, WHITE)
         surface.blit(timer_text, (current_x, y_start + icon_size + 2))
         current_x += icon_spacing
     
@@ -1514,7 +2001,7 @@ def draw_status_effect_icons(surface, player: Player, x_start, y_start):
         pygame.draw.line(surface, RED, (current_x + 4, y_start + 4), (current_x + icon_size - 4, y_start + icon_size - 4), 2)
         pygame.draw.line(surface, RED, (current_x + icon_size - 4, y_start + 4), (current_x + 4, y_start + icon_size - 4), 2)
         # Add timer text below
-        timer_text = pygame.font.SysFont("Arial", 12).render(f"{player.no_heal_time_left:.1f}s", True, WHITE)
+        timer_text = get_font("Arial", 12).render(f"{player.no_heal_time_left:.1f}s", True, WHITE)
         surface.blit(timer_text, (current_x, y_start + icon_size + 2))
         current_x += icon_spacing
     
@@ -1532,72 +2019,149 @@ def draw_status_effect_icons(surface, player: Player, x_start, y_start):
         pygame.draw.polygon(surface, (255, 215, 0), shield_points)  # Gold
         pygame.draw.polygon(surface, (200, 170, 0), shield_points, 2)  # Darker gold border
         # Add timer text below
-        timer_text = pygame.font.SysFont("Arial", 12).render(f"{player.invuln_timer:.1f}s", True, WHITE)
+        timer_text = get_font("Arial", 12).render(f"{player.invuln_timer:.1f}s", True, WHITE)
         surface.blit(timer_text, (current_x, y_start + icon_size + 2))
         current_x += icon_spacing
 
 
-def draw_hud(surface, font_small, player: Player, state: GameState):
-    # Create bold font for HUD
-    font_bold = pygame.font.SysFont("Arial", 20, bold=True)
-    
-    # Wave countdown at top center (bold)
-    if not state.in_safe_area and state.wave_cooldown > 0:
-        countdown_text = font_bold.render(f"Next Wave in: {int(state.wave_cooldown + 1)}", True, YELLOW)
-        surface.blit(countdown_text, (WIDTH//2 - countdown_text.get_width()//2, 10))
-    
-    # HP/Mana bars
-    draw_bar(surface, 20, 20, 220, 16, player.hp / max(1, player.max_hp), RED)
-    draw_bar(surface, 20, 40, 220, 16, player.mana / max(1, player.max_mana), BLUE)
-    
-    # Status effect icons (below mana bar)
-    draw_status_effect_icons(surface, player, 20, 60)
+class HudLabel(pygame.sprite.Sprite):
+    """HUD text that is only re-rendered when its string changes.
+
+    With key_of, the string itself is only rebuilt when that key changes.
+    """
+
+    def __init__(self, font, pos, color, text_of, key_of=None):
+        super().__init__()
+        self.font = font
+        self.pos = pos
+        self.color = color
+        self.text_of = text_of
+        self.key_of = key_of
+        self.key = None
+        self.text = None
+        self.image = pygame.Surface((0, 0))
+        self.rect = self.image.get_rect(topleft=pos)
+
+    def update(self, state):
+        if self.key_of is not None:
+            key = self.key_of(state)
+            if key == self.key:
+                return
+            self.key = key
+        text = self.text_of(state)
+        if text != self.text:
+            self.text = text
+            self.image = self.font.render(text, True, self.color)
+            self.rect = self.image.get_rect(topleft=self.pos)
+
+
+class HudBar(pygame.sprite.Sprite):
+    """HUD bar that is only redrawn when its filled width changes"""
+
+    def __init__(self, pos, size, color, ratio_of):
+        super().__init__()
+        self.color = color
+        self.ratio_of = ratio_of
+        self.fill_w = None
+        self.image = pygame.Surface(size).convert()
+        self.rect = self.image.get_rect(topleft=pos)
+
+    def update(self, state):
+        ratio = self.ratio_of(state)
+        fill_w = int(self.rect.w * max(0, min(1, ratio)))
+        if fill_w != self.fill_w:
+            self.fill_w = fill_w
+            draw_bar(self.image, 0, 0, self.rect.w, self.rect.h, ratio, self.color)
+
+
+def _hub_view_key(state: GameState) -> tuple:
+    """Everything the safe-area frame depends on; equal keys mean an identical frame.
+
+    Anything drawn in the hub must be listed here, or it freezes on screen while
+    the hub is idle (see the idle skip in main()). Losing the screen contents
+    (set_mode, expose) is not part of the key: set state.full_redraw instead.
+    """
+    # HUD sprites: update them now and key on exactly what they will draw
+    if state.hud_group is None:
+        state.hud_group = build_hud_group()
+    state.hud_group.update(state)
+    hud = tuple(sp.text if isinstance(sp, HudLabel) else sp.fill_w for sp in state.hud_group)
+    p = state.player
+    return (
+        hud,
+        # draw_hud extras: status icons, info message, floating messages
+        p.bleed_time_left, p.no_heal_time_left, p.invuln_timer,
+        state.info_message, state.info_timer > 0, tuple(state.floating_messages),
+        # Banner and stats overlay
+        state.current_banner, state.banner_timer > 0, state.show_stats,
+        # Hub drawing: player, merchant label and next-item hints
+        p.x, p.y, p.color, p.weapon_id, p.armor_id, p.next_weapon_id, p.next_armor_id,
+    )
 
-    # Equipment info (left side, below status icons) - bold text
-    wpn = get_weapon(player)
-    arm = get_armor(player)
-    
-    # Armor display - show "Broken" if no hits remaining, otherwise show armor name
-    armor_display = "Broken" if player.armor_hits_remaining <= 0 else arm['label']
-    
-    weapon_txt = font_bold.render(f"Weapon: {wpn['label']}", True, WHITE)
-    surface.blit(weapon_txt, (20, 104))  # Moved down to make room for status icons
-    armor_txt = font_bold.render(f"Armor: {armor_display}", True, WHITE)
-    surface.blit(armor_txt, (20, 126))  # Moved down to make room for status icons
 
-    # Gold, EXP, Level (top right, next to HP/Mana bars) - bold text
-    exp_needed = get_exp_needed_for_level(player.level)
-    
-    # Create colored text for gold (gold color), exp (RGB), and level (purple)
-    gold_color = (255, 215, 0)  # Gold color
-    exp_color = (255, 0, 255)   # Magenta/RGB color  
-    level_color = (128, 0, 128) # Purple color
-    
-    gold_txt = font_bold.render(f"Gold: {player.gold}", True, gold_color)
-    exp_txt = font_bold.render(f"EXP: {player.exp}/{exp_needed}", True, exp_color)
-    level_txt = font_bold.render(f"Lv: {player.level}", True, level_color)
-    
-    # Position these to the right of the HP/Mana bars
-    surface.blit(gold_txt, (260, 20))
-    surface.blit(exp_txt, (260, 40))
-    surface.blit(level_txt, (260, 60))
+def _game_info_key(state: GameState) -> tuple:
+    return (state.stage, state.wave, int(state.play_time), state.score, state.in_safe_area)
+
 
-    # Game info (stage, wave, time, score) - bold text
+def _game_info_text(state: GameState) -> str:
     time_secs = int(state.play_time)
     mins = time_secs // 60
     secs = time_secs % 60
-    game_info = font_bold.render(
-        f"Stage: {state.stage}  Wave: {state.wave if not state.in_safe_area else 'Safe'}  Time: {mins:02d}:{secs:02d}  Score: {state.score}",
-        True, WHITE)
-    surface.blit(game_info, (20, 148))  # Moved down to make room for equipment info
+    return f"Stage: {state.stage}  Wave: {state.wave if not state.in_safe_area else 'Safe'}  Time: {mins:02d}:{secs:02d}  Score: {state.score}"
 
 
+def build_hud_group() -> pygame.sprite.RenderUpdates:
+    """Persistent HUD sprites: bars, equipment, gold/EXP/level and game info"""
+    font_bold = get_font("Arial", 20, bold=True)
+    gold_color = (255, 215, 0)  # Gold color
+    exp_color = (255, 0, 255)   # Magenta/RGB color
+    level_color = (128, 0, 128) # Purple color
+    return pygame.sprite.RenderUpdates(
+        # HP/Mana bars
+        HudBar((20, 20), (220, 16), RED, lambda st: st.player.hp / max(1, st.player.max_hp)),
+        HudBar((20, 40), (220, 16), BLUE, lambda st: st.player.mana / max(1, st.player.max_mana)),
+        # Equipment info (left side, below status icons); armor shows "Broken" when out of hits
+        HudLabel(font_bold, (20, 104), WHITE, lambda st: f"Weapon: {st.player.weapon_data['label']}",
+                 lambda st: st.player.weapon_id),
+        HudLabel(font_bold, (20, 126), WHITE, lambda st: "Armor: " + (
+            "Broken" if st.player.armor_hits_remaining <= 0 else st.player.armor_data['label']),
+                 lambda st: (st.player.armor_id, st.player.armor_hits_remaining <= 0)),
+        # Gold, EXP, Level (to the right of the HP/Mana bars)
+        HudLabel(font_bold, (260, 20), gold_color, lambda st: f"Gold: {st.player.gold}"),
+        HudLabel(font_bold, (260, 40), exp_color,
+                 lambda st: f"EXP: {st.player.exp}/{get_exp_needed_for_level(st.player.level)}"),
+        HudLabel(font_bold, (260, 60), level_color, lambda st: f"Lv: {st.player.level}"),
+        # Game info (stage, wave, time, score)
+        HudLabel(font_bold, (20, 148), WHITE, _game_info_text, _game_info_key),
+    )
+
+
+def draw_hud(surface, font_small, player: Player, state: GameState) -> List[pygame.Rect]:
+    """Draw the HUD; returns the rects of floating messages drawn outside HUD_BAND"""
+    # Bold HUD font (cached; SysFont is slow to create)
+    font_bold = get_font("Arial", 20, bold=True)
+    
+    # Wave countdown at top center (bold)
+    if not state.in_safe_area and state.next_spawn_time is not None and state.next_spawn_time > state.game_clock:
+        remaining = state.next_spawn_time - state.game_clock
+        countdown_text = render_text(state, font_bold, f"Next Wave in: {int(remaining + 1)}", YELLOW)
+        surface.blit(countdown_text, (WIDTH//2 - countdown_text.get_width()//2, 10))
+    
+    # Bars and labels re-render only when their values change
+    if state.hud_group is None:
+        state.hud_group = build_hud_group()
+    state.hud_group.update(state)
+    state.hud_group.draw(surface)
+    
+    # Status effect icons (below mana bar)
+    draw_status_effect_icons(surface, player, 20, 60)
 
     if state.info_timer > 0 and state.info_message:
-        msg = font_bold.render(state.info_message, True, WHITE)
+        msg = render_text(state, font_bold, state.info_message, WHITE)
         surface.blit(msg, (WIDTH//2 - msg.get_width()//2, 35))
     
     # Draw floating messages that follow player
+    dirty = []
     for text, timer, offset_x, offset_y in state.floating_messages:
         alpha = min(255, int(timer * 255))  # Fade out
         color = (255, 255, 255, alpha) if "gold" in text.lower() else (255, 255, 0, alpha)
@@ -1608,39 +2172,45 @@ def draw_hud(surface, font_small, player: Player, state: GameState):
         else:
             color = (255, 255, 255)  # White for other messages
             
-        msg_surface = font_bold.render(text, True, color)
+        msg_surface = render_text(state, font_bold, text, color)
         x = player.x + player.w//2 + offset_x - msg_surface.get_width()//2
         y = player.y + offset_y
-        surface.blit(msg_surface, (x, y))
+        dirty.append(surface.blit(msg_surface, (x, y)))
+    return dirty
+
 
+# Stats page dimming overlay keyed by alpha
+_STATS_OVERLAY = {}
 
 def draw_stats_page(surface, font_small, player: Player, state: GameState):
     """Draw the stats page overlay"""
-    # Create semi-transparent background
-    overlay = pygame.Surface((WIDTH, HEIGHT))
-    overlay.set_alpha(200)
-    overlay.fill((0, 0, 0))
+    # Semi-transparent background (built once)
+    overlay = _STATS_OVERLAY.get(200)
+    if overlay is None:
+        overlay = _STATS_OVERLAY[200] = pygame.Surface((WIDTH, HEIGHT)).convert()
+        overlay.set_alpha(200)
+        overlay.fill((0, 0, 0))
     surface.blit(overlay, (0, 0))
     
-    # Create fonts
-    font_title = pygame.font.SysFont("Arial", 32, bold=True)
-    font_header = pygame.font.SysFont("Arial", 24, bold=True)
-    font_stat = pygame.font.SysFont("Arial", 18)
-    font_small_stat = pygame.font.SysFont("Arial", 16)
+    # Fonts (cached; SysFont is slow to create) and text through the text cache
+    font_title = get_font("Arial", 32, bold=True)
+    font_header = get_font("Arial", 24, bold=True)
+    font_stat = get_font("Arial", 18)
+    font_small_stat = get_font("Arial", 16)
     
     # Get equipment data
     weapon = get_weapon(player)
     armor = get_armor(player)
     
     # Title
-    title = font_title.render("PLAYER STATS", True, WHITE)
+    title = render_text(state, font_title, "PLAYER STATS", WHITE)
     surface.blit(title, (WIDTH//2 - title.get_width()//2, 30))
     
     # Left Column - Basic Stats
     left_x = 80
     y_offset = 90
     
-    basic_header = font_header.render("Basic Stats", True, YELLOW)
+    basic_header = render_text(state, font_header, "Basic Stats", YELLOW)
     surface.blit(basic_header, (left_x, y_offset))
     y_offset += 35
     
@@ -1669,13 +2239,13 @@ def draw_stats_page(surface, font_small, player: Player, state: GameState):
     ]
     
     for stat in stats_text:
-        stat_surface = font_stat.render(stat, True, WHITE)
+        stat_surface = render_text(state, font_stat, stat, WHITE)
         surface.blit(stat_surface, (left_x + 20, y_offset))
         y_offset += 22
     
     # Combat Stats Section
     y_offset += 15
-    combat_header = font_header.render("Combat Stats", True, YELLOW)
+    combat_header = render_text(state, font_header, "Combat Stats", YELLOW)
     surface.blit(combat_header, (left_x, y_offset))
     y_offset += 35
     
@@ -1688,13 +2258,13 @@ def draw_stats_page(surface, font_small, player: Player, state: GameState):
     ]
     
     for stat in combat_stats:
-        stat_surface = font_stat.render(stat, True, CYAN)
+        stat_surface = render_text(state, font_stat, stat, CYAN)
         surface.blit(stat_surface, (left_x + 20, y_offset))
         y_offset += 22
     
     # Status Effects Section
     y_offset += 15
-    status_header = font_header.render("Status Effects", True, YELLOW)
+    status_header = render_text(state, font_header, "Status Effects", YELLOW)
     surface.blit(status_header, (left_x, y_offset))
     y_offset += 35
     
@@ -1709,23 +2279,23 @@ def draw_stats_page(surface, font_small, player: Player, state: GameState):
     
     if status_effects:
         for effect in status_effects:
-            effect_surface = font_stat.render(effect, True, RED)
+            effect_surface = render_text(state, font_stat, effect, RED)
             surface.blit(effect_surface, (left_x + 20, y_offset))
             y_offset += 22
     else:
-        no_effects = font_stat.render("None", True, GREEN)
+        no_effects = render_text(state, font_stat, "None", GREEN)
         surface.blit(no_effects, (left_x + 20, y_offset))
     
     # Right Column - Equipment
     right_x = WIDTH // 2 + 40
     y_offset = 90
     
-    equipment_header = font_header.render("Equipment", True, YELLOW)
+    equipment_header = render_text(state, font_header, "Equipment", YELLOW)
     surface.blit(equipment_header, (right_x, y_offset))
     y_offset += 35
     
     # Weapon info
-    weapon_text = font_stat.render(f"Weapon: {weapon['label']}", True, WHITE)
+    weapon_text = render_text(state, font_stat, f"Weapon: {weapon['label']}", WHITE)
     surface.blit(weapon_text, (right_x + 20, y_offset))
     y_offset += 25
     
@@ -1737,7 +2307,7 @@ def draw_stats_page(surface, font_small, player: Player, state: GameState):
     ]
     
     for stat in weapon_stats:
-        stat_surface = font_small_stat.render(stat, True, (200, 200, 200))
+        stat_surface = render_text(state, font_small_stat, stat, (200, 200, 200))
         surface.blit(stat_surface, (right_x + 20, y_offset))
         y_offset += 18
     
@@ -1746,28 +2316,28 @@ def draw_stats_page(surface, font_small, player: Player, state: GameState):
     # Armor info
     armor_display = "Broken" if player.armor_hits_remaining <= 0 else armor['label']
     armor_color = RED if player.armor_hits_remaining <= 0 else WHITE
-    armor_text = font_stat.render(f"Armor: {armor_display}", True, armor_color)
+    armor_text = render_text(state, font_stat, f"Armor: {armor_display}", armor_color)
     surface.blit(armor_text, (right_x + 20, y_offset))
     y_offset += 25
     
     if player.armor_hits_remaining > 0:
         armor_stats = [
-            f"  Max Hits: {armor['hits']}",
-            f"  Hits Remaining: {player.armor_hits_remaining}/{armor['hits']}",
+            f"  Max Hits: {player.max_armor_hits}",
+            f"  Hits Remaining: {player.armor_hits_remaining}/{player.max_armor_hits}",
             f"  Cost: {armor['price']} gold"
         ]
         
         for stat in armor_stats:
-            stat_surface = font_small_stat.render(stat, True, (200, 200, 200))
+            stat_surface = render_text(state, font_small_stat, stat, (200, 200, 200))
             surface.blit(stat_surface, (right_x + 20, y_offset))
             y_offset += 18
     else:
-        broken_text = font_small_stat.render("  Armor is broken!", True, RED)
+        broken_text = render_text(state, font_small_stat, "  Armor is broken!", RED)
         surface.blit(broken_text, (right_x + 20, y_offset))
     
     # Game Progress Section
     y_offset += 30
-    progress_header = font_header.render("Game Progress", True, YELLOW)
+    progress_header = render_text(state, font_header, "Game Progress", YELLOW)
     surface.blit(progress_header, (right_x, y_offset))
     y_offset += 35
     
@@ -1778,19 +2348,96 @@ def draw_stats_page(surface, font_small, player: Player, state: GameState):
     ]
     
     for stat in progress_stats:
-        stat_surface = font_stat.render(stat, True, WHITE)
+        stat_surface = render_text(state, font_stat, stat, WHITE)
         surface.blit(stat_surface, (right_x + 20, y_offset))
         y_offset += 22
     
     # Instructions
-    instruction = font_stat.render("Press TAB to close", True, YELLOW)
+    instruction = render_text(state, font_stat, "Press TAB to close", YELLOW)
     surface.blit(instruction, (WIDTH//2 - instruction.get_width()//2, HEIGHT - 40))
 
 
-def draw_stage_banner(surface, font_big, text):
-    banner = font_big.render(text, True, WHITE)
-    surface.blit(banner, (WIDTH//2 - banner.get_width()//2, 120))
+# Static menu pages, pre-rendered once by build_menu_cache()
+MENU_PAGES = {
+    "main": [
+        "New Game",
+        "Continue",
+        "Settings",
+        "Controls",
+        "Quit Game",
+    ],
+    "pause": [
+        "Resume",
+        "Settings",
+        "Controls",
+        "Return to Main Menu",
+        "Save & Quit",
+    ],
+    "main_controls": [
+        "Controls: [Enter to collapse]",
+        "Movement: W/A/S/D keys",
+        "Combat: LMB = Slash, F = Magic, L = Dash",
+        "Interaction: E = Interact with Merchant",
+        "Shopping: Q/E = Buy Weapon/Armor at Merchant",
+        "Game: N = Start Stage, P = Pause/Resume",
+        "Display: F11 = Toggle Fullscreen",
+        "Save: Shift+Q = Save & Quit",
+        "Back",
+    ],
+    "pause_controls": [
+        "Controls: [Enter to collapse]",
+        "Movement: W/A/S/D keys",
+        "Combat: LMB = Slash, F = Magic, L = Dash",
+        "Interaction: E = Interact with Merchant",
+        "Shopping: Q/E = Buy Weapon/Armor at Merchant",
+        "Level Up: Automatic (Attack→Magic→Health→Mana)",
+        "Game: N = Start Stage, P = Pause/Resume",
+        "Display: F11 = Toggle Fullscreen",
+        "Save: Shift+Q = Save & Quit",
+        "Back",
+    ],
+    "controls_collapsed": [
+        "Controls: [Enter to expand]",
+        "Back",
+    ],
+}
+
+def build_menu_cache(font) -> dict:
+    """Render every static menu line once as (normal, selected) surfaces"""
+    return {
+        page: [(font.render("  " + ln, True, WHITE), font.render("> " + ln, True, YELLOW)) for ln in lines]
+        for page, lines in MENU_PAGES.items()
+    }
 
+def settings_menu_lines(state: GameState) -> List[str]:
+    fullscreen_text = "ON" if state.fullscreen else "OFF"
+    sound_text = "ON" if state.sound_enabled else "OFF"
+    music_text = "ON" if state.music_enabled else "OFF"
+    return [
+        "Settings:",
+        f"Fullscreen: {fullscreen_text}  [F11 or Enter to toggle]",
+        f"Master Volume: {int(state.volume*100)}%  [+/- or Left/Right]",
+        f"Sound Effects: {sound_text}  [Enter to toggle]",
+        f"SFX Volume: {int(state.sfx_volume*100)}%  [A/D to adjust]",
+        f"Music: {music_text}  [Enter to toggle]",
+        f"Music Volume: {int(state.music_volume*100)}%  [Q/E to adjust]",
+        "Back",
+    ]
+
+def draw_menu_page(surface, state: GameState, font, page: str, y: int):
+    """Draw a menu page with highlight and cursor for the selected option"""
+    cached = state.menu_cache.get(page)
+    if cached is not None:
+        surfaces = [selected if i == state.menu_index else normal
+                    for i, (normal, selected) in enumerate(cached)]
+    else:
+        # Settings values change, so those lines go through the text cache
+        surfaces = [render_text(state, font, "> " + ln, YELLOW) if i == state.menu_index
+                    else render_text(state, font, "  " + ln, WHITE)
+                    for i, ln in enumerate(settings_menu_lines(state))]
+    for t in surfaces:
+        surface.blit(t, (WIDTH//2 - t.get_width()//2, y))
+        y += 28
 
 def load_imp_sprites():
     """Load imp sprites and remove background"""
@@ -1939,6 +2586,7 @@ def main():
     font_small_bold = pygame.font.SysFont(FONT_NAME, 20, bold=True)
     state.font_big = font_big
     state.font_small = font_small
+    state.menu_cache = build_menu_cache(font_small)
 
     # Load sprites
     state.imp_sprites = load_imp_sprites()
@@ -1966,6 +2614,13 @@ def main():
         'menu_confirm': load_sound('menu_confirm.wav'),
         'menu_back': load_sound('menu_back.wav'),
     }
+    state.loaded_sounds = tuple(snd for snd in state.sounds.values() if snd)
+    # Bind frequently played sounds once instead of looking them up per event
+    state.snd_boss_explode = state.sounds.get('boss_explode')
+    state.snd_swing = state.sounds.get('swing')
+    state.snd_fireball = state.sounds.get('fireball')
+    state.snd_menu_move = state.sounds.get('menu_move')
+    state.snd_menu_confirm = state.sounds.get('menu_confirm')
     
     # Apply loaded audio settings
     apply_audio_settings(state)
@@ -1976,12 +2631,26 @@ def main():
     # Merchant (will be set up when entering safe area)
     merchant_rect = pygame.Rect(WIDTH//2 - 40, 160, 80, 80)
     merchant = Merchant(x=merchant_rect.x+16, y=merchant_rect.y+16, w=48, h=48, hp=1, max_hp=1, color=(200, 200, 80), name="Merchant")
+    safe_bg = render_safe_bg(merchant_rect, merchant)
+
+    # Cooldown deadlines on state.game_clock
+    next_attack_time = 0.0
+    next_magic_time = 0.0
 
-    last_attack = 0
-    last_magic = 0
+    # Builtins and RNG used every frame, bound as locals (LOAD_FAST instead of global lookups)
+    _min, _max = min, max
+    _expovariate = random.expovariate
 
     while True:
-        dt = clock.tick(FPS) / 1000.0
+        if state.in_main_menu or state.paused:
+            fps = PAUSED_FPS
+        elif state.hub_idle:
+            fps = HUB_IDLE_FPS
+        else:
+            fps = FPS
+        dt = clock.tick(fps) / 1000.0
+        # One clock read per frame for the menu debounce
+        now = time.monotonic()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 # autosave
@@ -1992,7 +2661,13 @@ def main():
                     pass
                 pygame.quit()
                 sys.exit(0)
+            elif event.type == pygame.VIDEOEXPOSE:
+                # Window contents were lost: repaint menus and push a full gameplay frame
+                state.menu_needs_redraw = True
+                state.full_redraw = True
             elif event.type == pygame.KEYDOWN:
+                # Any key may change a menu, enter the pause screen or leave it
+                state.menu_needs_redraw = True
                 # Pause: open menu
                 if event.key == pygame.K_p:
                     state.paused = True
@@ -2012,6 +2687,7 @@ def main():
                 # F11 toggles fullscreen
                 if event.key == pygame.K_F11:
                     screen = toggle_fullscreen(state)
+                    state.full_redraw = True  # set_mode() gives a blank display
                 # Tab toggles stats page (only during gameplay)
                 if event.key == pygame.K_TAB and not state.in_main_menu and not state.paused:
                     state.show_stats = not state.show_stats
@@ -2020,7 +2696,7 @@ def main():
                 if state.in_main_menu:
                     if event.key in (pygame.K_UP, pygame.K_w):
                         # Debounce navigation
-                        if time.time() - state.menu_last_nav_time >= state.menu_nav_delay:
+                        if now >= state.menu_next_nav_time:
                             # Determine which lines are selectable for navigation
                             if state.menu_page == "main":
                                 selectable = [0, 1, 2, 3, 4, 5]
@@ -2035,13 +2711,11 @@ def main():
                             prev = [i for i in selectable if i < state.menu_index]
                             if prev:
                                 state.menu_index = prev[-1]
-                                snd = state.sounds.get('menu_move')
-                                if snd:
-                                    snd.play()
-                            state.menu_last_nav_time = time.time()
+                                play_sound(state.snd_menu_move)
+                            state.menu_next_nav_time = now + state.menu_nav_delay
                     if event.key in (pygame.K_DOWN, pygame.K_s):
                         # Debounce navigation
-                        if time.time() - state.menu_last_nav_time >= state.menu_nav_delay:
+                        if now >= state.menu_next_nav_time:
                             # Determine which lines are selectable for navigation
                             if state.menu_page == "main":
                                 selectable = [0, 1, 2, 3, 4, 5]
@@ -2056,10 +2730,8 @@ def main():
                             nxt = [i for i in selectable if i > state.menu_index]
                             if nxt:
                                 state.menu_index = nxt[0]
-                                snd = state.sounds.get('menu_move')
-                                if snd:
-                                    snd.play()
-                            state.menu_last_nav_time = time.time()
+                                play_sound(state.snd_menu_move)
+                            state.menu_next_nav_time = now + state.menu_nav_delay
                     if event.key == pygame.K_RETURN:
                         # Activate current selection
                         if state.menu_page == "main":
@@ -2081,9 +2753,7 @@ def main():
                                 # Setup safe area
                                 in_safe_area_setup(state)
                                 state.message("Welcome! Near Merchant: Q=Weapon, E=Armor. P=Pause Menu (P to Resume)", 4)
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 1:  # Continue
                                 # Try to load saved game
                                 try:
@@ -2091,95 +2761,76 @@ def main():
                                         data = json.load(f)
                                     state.deserialize(data)
                                     state.in_main_menu = False
-                                    snd = state.sounds.get('menu_confirm')
-                                    if snd:
-                                        snd.play()
+                                    play_sound(state.snd_menu_confirm)
                                 except Exception:
                                     state.message("No save file found!", 2)
                             elif state.menu_index == 2:  # Settings
                                 state.menu_page = "settings"
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 3:  # Controls
                                 state.menu_page = "controls"
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 4:  # Quit Game
                                 pygame.quit()
                                 sys.exit(0)
                         elif state.menu_page == "settings":
                             if state.menu_index == 1:  # Fullscreen toggle
                                 screen = toggle_fullscreen(state)
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                state.full_redraw = True
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 3:  # Sound toggle
                                 state.sound_enabled = not state.sound_enabled
-                                apply_audio_settings(state)
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                state.audio_dirty = True
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 5:  # Music toggle
                                 state.music_enabled = not state.music_enabled
-                                apply_audio_settings(state)
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                state.audio_dirty = True
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 7:  # Back
                                 state.menu_page = "main"
                                 state.menu_index = 0
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                         elif state.menu_page == "controls":
                             if state.menu_index == 0:  # Controls header - toggle expansion
                                 state.controls_expanded = not state.controls_expanded
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif (state.controls_expanded and state.menu_index == 8) or (not state.controls_expanded and state.menu_index == 1):  # Back
                                 state.menu_page = "main"
                                 state.menu_index = 0
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 4:  # Back
                                 state.menu_page = "main"
                                 state.menu_index = 1  # Go back to main menu
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                     # Volume controls for main menu settings
                     if state.menu_page == "settings":
                         # Master Volume
                         if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_RIGHT) and state.menu_index == 2:
                             state.volume = min(1.0, state.volume + 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         if event.key in (pygame.K_MINUS, pygame.K_LEFT) and state.menu_index == 2:
                             state.volume = max(0.0, state.volume - 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         # SFX Volume
                         if event.key == pygame.K_d and state.menu_index == 4:
                             state.sfx_volume = min(1.0, state.sfx_volume + 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         if event.key == pygame.K_a and state.menu_index == 4:
                             state.sfx_volume = max(0.0, state.sfx_volume - 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         # Music Volume
                         if event.key == pygame.K_e and state.menu_index == 6:
                             state.music_volume = min(1.0, state.music_volume + 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         if event.key == pygame.K_q and state.menu_index == 6:
                             state.music_volume = max(0.0, state.music_volume - 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
 
                 # Handle pause menu navigation and actions
                 elif state.paused:
                     if event.key in (pygame.K_UP, pygame.K_w):
                         # Debounce navigation
-                        if time.time() - state.menu_last_nav_time >= state.menu_nav_delay:
+                        if now >= state.menu_next_nav_time:
                             # Determine which lines are selectable for navigation
                             if state.menu_page == "pause":
                                 selectable = [0, 1, 2, 3, 4]
@@ -2194,13 +2845,11 @@ def main():
                             prev = [i for i in selectable if i < state.menu_index]
                             if prev:
                                 state.menu_index = prev[-1]
-                                snd = state.sounds.get('menu_move')
-                                if snd:
-                                    snd.play()
-                            state.menu_last_nav_time = time.time()
+                                play_sound(state.snd_menu_move)
+                            state.menu_next_nav_time = now + state.menu_nav_delay
                     if event.key in (pygame.K_DOWN, pygame.K_s):
                         # Debounce navigation
-                        if time.time() - state.menu_last_nav_time >= state.menu_nav_delay:
+                        if now >= state.menu_next_nav_time:
                             # Determine which lines are selectable for navigation
                             if state.menu_page == "pause":
                                 selectable = [0, 1, 2, 3, 4]
@@ -2215,40 +2864,28 @@ def main():
                             nxt = [i for i in selectable if i > state.menu_index]
                             if nxt:
                                 state.menu_index = nxt[0]
-                                snd = state.sounds.get('menu_move')
-                                if snd:
-                                    snd.play()
-                            state.menu_last_nav_time = time.time()
+                                play_sound(state.snd_menu_move)
+                            state.menu_next_nav_time = now + state.menu_nav_delay
                     if event.key == pygame.K_RETURN:
                         # Activate current selection
                         if state.menu_page == "pause":
                             if state.menu_index == 0:  # Resume
                                 state.paused = False
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 1:  # Settings
                                 state.menu_page = "settings"
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 2:  # Controls
                                 state.menu_page = "controls"
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 3:  # Return to Main Menu
                                 state.paused = False
                                 state.in_main_menu = True
                                 state.menu_page = "main"
                                 state.menu_index = 0
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 4:  # Save & Quit
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                                 try:
                                     with open(SAVE_FILE, 'w', encoding='utf-8') as f:
                                         json.dump(state.serialize(), f)
@@ -2259,80 +2896,72 @@ def main():
                         elif state.menu_page == "settings":
                             if state.menu_index == 1:  # Fullscreen toggle
                                 screen = toggle_fullscreen(state)
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                state.full_redraw = True
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 3:  # Sound toggle
                                 state.sound_enabled = not state.sound_enabled
-                                apply_audio_settings(state)
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                state.audio_dirty = True
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 5:  # Music toggle
                                 state.music_enabled = not state.music_enabled
-                                apply_audio_settings(state)
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                state.audio_dirty = True
+                                play_sound(state.snd_menu_confirm)
                             elif state.menu_index == 7:  # Back
                                 state.menu_page = "pause"
                                 state.menu_index = 0
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                         elif state.menu_page == "controls":
                             if state.menu_index == 0:  # Controls header - toggle expansion
                                 state.controls_expanded = not state.controls_expanded
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                             elif (state.controls_expanded and state.menu_index == 8) or (not state.controls_expanded and state.menu_index == 1):  # Back
                                 state.menu_page = "pause"
                                 state.menu_index = 0
-                                snd = state.sounds.get('menu_confirm')
-                                if snd:
-                                    snd.play()
+                                play_sound(state.snd_menu_confirm)
                     # Volume controls for pause menu settings
                     if state.menu_page == "settings":
                         # Master Volume
                         if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_RIGHT) and state.menu_index == 2:
                             state.volume = min(1.0, state.volume + 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         if event.key in (pygame.K_MINUS, pygame.K_LEFT) and state.menu_index == 2:
                             state.volume = max(0.0, state.volume - 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         # SFX Volume
                         if event.key == pygame.K_d and state.menu_index == 4:
                             state.sfx_volume = min(1.0, state.sfx_volume + 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         if event.key == pygame.K_a and state.menu_index == 4:
                             state.sfx_volume = max(0.0, state.sfx_volume - 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         # Music Volume
                         if event.key == pygame.K_e and state.menu_index == 6:
                             state.music_volume = min(1.0, state.music_volume + 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
                         if event.key == pygame.K_q and state.menu_index == 6:
                             state.music_volume = max(0.0, state.music_volume - 0.1)
-                            apply_audio_settings(state)
+                            state.audio_dirty = True
 
                 # Merchant quick-buy keys (only in safe area and near merchant, and not with god equipment)
                 if state.in_safe_area and state.player.rect().colliderect(merchant_rect) and not has_god_equipment(state.player):
                     if event.key == pygame.K_q:  # weapon cycle forward
-                        curr_idx = ORDERED_WEAPONS.index(state.player.weapon_id)
-                        next_id = ORDERED_WEAPONS[(curr_idx + 1) % len(ORDERED_WEAPONS)]
+                        next_id = state.player.next_weapon_id
                         if try_buy_weapon(state.player, next_id):
                             state.message(f"Bought {WEAPONS[next_id]['label']}!")
                         else:
                             state.message("Not enough gold.")
                     if event.key == pygame.K_e:  # armor cycle forward
-                        curr_idx = ORDERED_ARMORS.index(state.player.armor_id)
-                        next_id = ORDERED_ARMORS[(curr_idx + 1) % len(ORDERED_ARMORS)]
+                        next_id = state.player.next_armor_id
                         if try_buy_armor(state.player, next_id):
                             state.message(f"Bought {ARMORS[next_id]['label']} Armor!")
                         else:
                             state.message("Not enough gold.")
 
+        # Push audio setting changes to the mixer once per frame
+        if state.audio_dirty:
+            apply_audio_settings(state)
+            state.audio_dirty = False
+
         keys = pygame.key.get_pressed()
         mouse = pygame.mouse.get_pos()
         mb = pygame.mouse.get_pressed()
@@ -2340,6 +2969,10 @@ def main():
         # Update message timer
         if state.info_timer > 0:
             state.info_timer -= dt
+        if state.banner_timer > 0:
+            state.banner_timer -= dt
+            if state.banner_timer <= 0:
+                state.current_banner = None
         
         # Update floating messages
         new_floating = []
@@ -2351,235 +2984,71 @@ def main():
 
         # If in main menu, handle main menu and skip gameplay updates
         if state.in_main_menu:
-            screen.fill(BG_COLOR)
-            title = font_big.render("Sword & Magic", True, WHITE)
-            screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
-
-            if state.menu_page == "main":
-                lines = [
-                    "New Game",
-                    "Continue",
-                    "Settings",
-                    "Controls",
-                    "Quit Game",
-                ]
-            elif state.menu_page == "settings":
-                fullscreen_text = "ON" if state.fullscreen else "OFF"
-                sound_text = "ON" if state.sound_enabled else "OFF"
-                music_text = "ON" if state.music_enabled else "OFF"
-                lines = [
-                    "Settings:",
-                    f"Fullscreen: {fullscreen_text}  [F11 or Enter to toggle]",
-                    f"Master Volume: {int(state.volume*100)}%  [+/- or Left/Right]",
-                    f"Sound Effects: {sound_text}  [Enter to toggle]",
-                    f"SFX Volume: {int(state.sfx_volume*100)}%  [A/D to adjust]",
-                    f"Music: {music_text}  [Enter to toggle]",
-                    f"Music Volume: {int(state.music_volume*100)}%  [Q/E to adjust]",
-                    "Back",
-                ]
-            else:  # controls
-                if state.controls_expanded:
-                    lines = [
-                        "Controls: [Enter to collapse]",
-                        "Movement: W/A/S/D keys",
-                        "Combat: LMB = Slash, F = Magic, L = Dash",
-                        "Interaction: E = Interact with Merchant",
-                        "Shopping: Q/E = Buy Weapon/Armor at Merchant",
-                        "Game: N = Start Stage, P = Pause/Resume",
-                        "Display: F11 = Toggle Fullscreen",
-                        "Save: Shift+Q = Save & Quit",
-                        "Back",
-                    ]
-                else:
-                    lines = [
-                        "Controls: [Enter to expand]",
-                        "Back",
-                    ]
-
             # Determine which lines are selectable for navigation
             if state.menu_page == "main":
+                page = "main"
                 selectable = [0, 1, 2, 3, 4, 5]
             elif state.menu_page == "settings":
+                page = "settings"
                 selectable = [1, 2, 3, 4, 5, 6, 7]  # All settings options + Back
-
             else:  # controls
                 if state.controls_expanded:
+                    page = "main_controls"
                     selectable = [0, 8]  # Controls header and Back
                 else:
+                    page = "controls_collapsed"
                     selectable = [0, 1]  # Controls header and Back
 
             # Ensure current selection is valid
             if state.menu_index not in selectable:
                 state.menu_index = selectable[0]
 
-            # Draw lines with highlight and cursor for the selected option
-            y = 200
-            for i, ln in enumerate(lines):
-                is_sel = (i == state.menu_index)
-                color = YELLOW if is_sel else WHITE
-                label = ("> " + ln) if is_sel else ("  " + ln)
-                t = font_small.render(label, True, color)
-                screen.blit(t, (WIDTH//2 - t.get_width()//2, y))
-                y += 28
-
-            pygame.display.flip()
+            # Static screen: only redraw after input changed something
+            if state.menu_needs_redraw:
+                screen.fill(BG_COLOR)
+                title = render_text(state, font_big, "Sword & Magic", WHITE)
+                screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
+                draw_menu_page(screen, state, font_small, page, 200)
+                pygame.display.flip()
+                state.menu_needs_redraw = False
+            state.full_redraw = True
             continue
 
         # If paused, handle menu and draw overlay, skip gameplay updates
         elif state.paused:
             # Simple pause menu pages
-            screen.fill(BG_COLOR)
-            title = font_big.render("Paused", True, WHITE)
-            screen.blit(title, (WIDTH//2 - title.get_width()//2, 180))
-
-            if state.menu_page == "pause":
-                lines = [
-                    "Resume",
-                    "Settings", 
-                    "Controls",
-                    "Return to Main Menu",
-                    "Save & Quit",
-                ]
-            elif state.menu_page == "settings":
-                fullscreen_text = "ON" if state.fullscreen else "OFF"
-                sound_text = "ON" if state.sound_enabled else "OFF"
-                music_text = "ON" if state.music_enabled else "OFF"
-                lines = [
-                    "Settings:",
-                    f"Fullscreen: {fullscreen_text}  [F11 or Enter to toggle]",
-                    f"Master Volume: {int(state.volume*100)}%  [+/- or Left/Right]",
-                    f"Sound Effects: {sound_text}  [Enter to toggle]",
-                    f"SFX Volume: {int(state.sfx_volume*100)}%  [A/D to adjust]",
-                    f"Music: {music_text}  [Enter to toggle]",
-                    f"Music Volume: {int(state.music_volume*100)}%  [Q/E to adjust]",
-                    "Back",
-                ]
-            else:  # controls
-                if state.controls_expanded:
-                    lines = [
-                        "Controls: [Enter to collapse]",
-                        "Movement: W/A/S/D keys",
-                        "Combat: LMB = Slash, F = Magic, L = Dash",
-                        "Interaction: E = Interact with Merchant",
-                        "Shopping: Q/E = Buy Weapon/Armor at Merchant",
-                        "Level Up: Automatic (Attack→Magic→Health→Mana)",
-                        "Game: N = Start Stage, P = Pause/Resume",
-                        "Display: F11 = Toggle Fullscreen",
-                        "Save: Shift+Q = Save & Quit",
-                        "Back",
-                    ]
-                else:
-                    lines = [
-                        "Controls: [Enter to expand]",
-                        "Back",
-                    ]
-
             # Determine which lines are selectable for navigation
             if state.menu_page == "pause":
+                page = "pause"
                 selectable = [0, 1, 2, 3, 4]
             elif state.menu_page == "settings":
+                page = "settings"
                 selectable = [1, 2, 3, 4, 5, 6, 7]  # All settings options + Back
             else:  # controls
                 if state.controls_expanded:
+                    page = "pause_controls"
                     selectable = [0, 9]  # Controls header and Back
                 else:
+                    page = "controls_collapsed"
                     selectable = [0, 1]  # Controls header and Back
 
             # Ensure current selection is valid
             if state.menu_index not in selectable:
                 state.menu_index = selectable[0]
 
-            # Draw lines with highlight and cursor for the selected option
-            y = 240
-            for i, ln in enumerate(lines):
-                is_sel = (i == state.menu_index)
-                color = YELLOW if is_sel else WHITE
-                label = ("> " + ln) if is_sel else ("  " + ln)
-                t = font_small.render(label, True, color)
-                screen.blit(t, (WIDTH//2 - t.get_width()//2, y))
-                y += 28
-
-            pygame.display.flip()
+            # Static screen: only redraw after input changed something
+            if state.menu_needs_redraw:
+                screen.fill(BG_COLOR)
+                title = render_text(state, font_big, "Paused", WHITE)
+                screen.blit(title, (WIDTH//2 - title.get_width()//2, 180))
+                draw_menu_page(screen, state, font_small, page, 240)
+                pygame.display.flip()
+                state.menu_needs_redraw = False
+            state.full_redraw = True
             continue
 
-        # If paused, handle menu and draw overlay, skip gameplay updates
-        elif state.paused:
-            # Simple pause menu pages
-            screen.fill(BG_COLOR)
-            title = font_big.render("Paused", True, WHITE)
-            screen.blit(title, (WIDTH//2 - title.get_width()//2, 180))
-
-            if state.menu_page == "pause":
-                lines = [
-                    "Resume",
-                    "Settings",
-                    "Controls",
-                    "Return to Main Menu",
-                    "Save & Quit",
-                ]
-            elif state.menu_page == "settings":
-                fullscreen_text = "ON" if state.fullscreen else "OFF"
-                sound_text = "ON" if state.sound_enabled else "OFF"
-                music_text = "ON" if state.music_enabled else "OFF"
-                lines = [
-                    "Settings:",
-                    f"Fullscreen: {fullscreen_text}  [F11 or Enter to toggle]",
-                    f"Master Volume: {int(state.volume*100)}%  [+/- or Left/Right]",
-                    f"Sound Effects: {sound_text}  [Enter to toggle]",
-                    f"SFX Volume: {int(state.sfx_volume*100)}%  [A/D to adjust]",
-                    f"Music: {music_text}  [Enter to toggle]",
-                    f"Music Volume: {int(state.music_volume*100)}%  [Q/E to adjust]",
-                    "Back",
-                ]
-            else:  # controls
-                if state.controls_expanded:
-                    lines = [
-                        "Controls: [Enter to collapse]",
-                        "Movement: W/A/S/D keys",
-                        "Combat: LMB = Slash, F = Magic, L = Dash",
-                        "Interaction: E = Interact with Merchant",
-                        "Shopping: Q/E = Buy Weapon/Armor at Merchant",
-                        "Level Up: Automatic (Attack→Magic→Health→Mana)",
-                        "Game: N = Start Stage, P = Pause/Resume",
-                        "Display: F11 = Toggle Fullscreen",
-                        "Save: Shift+Q = Save & Quit",
-                        "Back",
-                    ]
-                else:
-                    lines = [
-                        "Controls: [Enter to expand]",
-                        "Back",
-                    ]
-
-            # Determine which lines are selectable for navigation
-            if state.menu_page == "pause":
-                selectable = [0, 1, 2, 3, 4]
-            elif state.menu_page == "settings":
-                selectable = [1, 2, 3, 4, 5, 6, 7]  # All settings options + Back
-            else:  # controls
-                if state.controls_expanded:
-                    selectable = [0, 9]  # Controls header and Back
-                else:
-                    selectable = [0, 1]  # Controls header and Back
-
-            # Ensure current selection is valid
-            if state.menu_index not in selectable:
-                state.menu_index = selectable[0]
-
-            # Draw lines with highlight and cursor for the selected option
-            y = 240
-            for i, ln in enumerate(lines):
-                is_sel = (i == state.menu_index)
-                color = YELLOW if is_sel else WHITE
-                label = ("> " + ln) if is_sel else ("  " + ln)
-                t = font_small.render(label, True, color)
-                screen.blit(t, (WIDTH//2 - t.get_width()//2, y))
-                y += 28
-
-            pygame.display.flip()
-            continue
-
-        # Unpaused: accumulate timer (only when not in safe area)
+        # Unpaused: advance the cooldown clock, and the play timer (only when not in safe area)
+        state.game_clock += dt
         if not state.in_safe_area:
             state.play_time += dt
         
@@ -2590,45 +3059,44 @@ def main():
                 state.message("A portal opens... Shyssa awaits.", 4)
 
         # Player update
-        state.player.invuln_timer = max(0, state.player.invuln_timer - dt)
+        state.player.invuln_timer = _max(0, state.player.invuln_timer - dt)
         # Status effects: bleed and no-heal timers
         if state.player.bleed_time_left > 0:
-            state.player.bleed_time_left = max(0.0, state.player.bleed_time_left - dt)
+            state.player.bleed_time_left = _max(0.0, state.player.bleed_time_left - dt)
             state.player.bleed_tick_accum += dt
-            while state.player.bleed_tick_accum >= 0.5 and state.player.hp > 0:
-                state.player.bleed_tick_accum -= 0.5
-                # Deal small chunks based on dps
-                state.player.hp = max(0, state.player.hp - int(max(1.0, state.player.bleed_dps * 0.5)))
+            if state.player.bleed_tick_accum >= 0.5 and state.player.hp > 0:
+                # Apply every elapsed 0.5s tick at once, in small chunks based on dps
+                ticks = int(state.player.bleed_tick_accum // 0.5)
+                state.player.bleed_tick_accum -= ticks * 0.5
+                dmg = ticks * int(_max(1.0, state.player.bleed_dps * 0.5))
+                state.player.hp = _max(0, state.player.hp - dmg)
         if state.player.no_heal_time_left > 0:
-            state.player.no_heal_time_left = max(0.0, state.player.no_heal_time_left - dt)
+            state.player.no_heal_time_left = _max(0.0, state.player.no_heal_time_left - dt)
         # Move with obstacle collision
         prev_px, prev_py = state.player.x, state.player.y
         state.player.move(keys)
-        resolve_entity_collision(state.player, obstacles, prev_px, prev_py)
+        resolve_entity_collision(state.player, state.obstacle_rects, prev_px, prev_py)
+        state.player.sync_center()
 
         # Attacks
         # Sword -> Left mouse click
-        if mb[0] and time.time() - last_attack > 0.25:
-            if state.player.sword_attack(state.enemies):
+        if mb[0] and state.game_clock > next_attack_time:
+            if state.player.sword_attack(state.enemies, state.play_time):
                 state.message("Slash!")
                 # Score for melee hit
                 state.score += 1
                 # Play swing
-                snd = state.sounds.get('swing')
-                if snd:
-                    snd.play()
-            last_attack = time.time()
+                play_sound(state.snd_swing)
+            next_attack_time = state.game_clock + 0.25
         # Magic -> F key
-        if keys[pygame.K_f] and time.time() - last_magic > 0.35:
+        if keys[pygame.K_f] and state.game_clock > next_magic_time:
             pr = state.player.cast_magic(mouse)
             if pr:
                 state.projectiles.append(pr)
                 state.message("Cast!")
                 # Play fireball
-                snd = state.sounds.get('fireball')
-                if snd:
-                    snd.play()
-                last_magic = time.time()
+                play_sound(state.snd_fireball)
+                next_magic_time = state.game_clock + 0.35
         if keys[pygame.K_l]:
             state.player.dash(mouse)
 
@@ -2648,6 +3116,7 @@ def main():
                     leave_safe_area(state)
                     # generate obstacles for this stage
                     obstacles = generate_arena_obstacles(state.stage)
+                    prepare_arena(state, obstacles)
                     if state.stage == SECRET_BOSS_STAGE:
                         state.message(f"Secret Boss Stage: The final battle!", 3)
                     else:
@@ -2655,160 +3124,150 @@ def main():
                         state.message(f"Bonus Stage {state.stage} - Stage Clear with boss: {boss_name}", 3)
         else:
             # Combat update: spawn waves, update enemies
-            alive = []
-            for e in state.enemies:
+            # Survivors are compacted in place; summons may extend the list mid-pass
+            enemies = state.enemies
+            deaths = []
+            w = 0
+            r = 0
+            while r < len(enemies):
+                e = enemies[r]
+                r += 1
                 prev_x, prev_y = e.x, e.y
-                e.update(state.player, obstacles)
+                e.update(state.player, state.obstacle_rects, state.flyer_rects)
                 # Shooting behaviors
-                if getattr(e, 'shoot_interval', 0.0) > 0.0:
+                if e.shoot_interval > 0.0:
                     e.shoot_timer += dt
                     if e.shoot_timer >= e.shoot_interval:
                         e.shoot_timer -= e.shoot_interval
                         ex, ey = e.x + e.w/2, e.y + e.h/2
                         # Pattern selection
                         if e.projectile_pattern == 'aim':
-                            px, py = state.player.x + state.player.w/2, state.player.y + state.player.h/2
+                            px, py = state.player.cx, state.player.cy
                             dx, dy = px - ex, py - ey
                             dist = math.hypot(dx, dy) or 1
                             vx = e.projectile_speed * dx / dist
                             vy = e.projectile_speed * dy / dist
-                            state.projectiles.append(Projectile(ex, ey, vx, vy, e.projectile_damage, e.projectile_color, radius=e.projectile_radius, from_player=False, effect=e.projectile_effect, effect_value=e.projectile_effect_value, effect_duration=e.projectile_effect_duration))
+                            spawn_projectile(state, ex, ey, vx, vy, e.projectile_damage, e.projectile_color, radius=e.projectile_radius, from_player=False, effect=e.projectile_effect, effect_value=e.projectile_effect_value, effect_duration=e.projectile_effect_duration)
                         elif e.projectile_pattern == 'cross4':
-                            dirs = [(1,0),(-1,0),(0,1),(0,-1)]
-                            for dx, dy in dirs:
+                            for dx, dy in _CROSS4:
                                 vx = e.projectile_speed * dx
                                 vy = e.projectile_speed * dy
-                                state.projectiles.append(Projectile(ex, ey, vx, vy, e.projectile_damage, e.projectile_color, radius=e.projectile_radius, from_player=False, effect=e.projectile_effect, effect_value=e.projectile_effect_value, effect_duration=e.projectile_effect_duration))
+                                spawn_projectile(state, ex, ey, vx, vy, e.projectile_damage, e.projectile_color, radius=e.projectile_radius, from_player=False, effect=e.projectile_effect, effect_value=e.projectile_effect_value, effect_duration=e.projectile_effect_duration)
                         elif e.projectile_pattern == 'cross8':
-                            # 8 directions (4 cardinal + 4 diagonal)
-                            dirs = [(1,0),(-1,0),(0,1),(0,-1),(1,1),(-1,1),(1,-1),(-1,-1)]
-                            for dx, dy in dirs:
-                                # Normalize diagonal directions
-                                length = math.hypot(dx, dy)
-                                vx = e.projectile_speed * dx / length
-                                vy = e.projectile_speed * dy / length
-                                state.projectiles.append(Projectile(ex, ey, vx, vy, e.projectile_damage, e.projectile_color, radius=e.projectile_radius, from_player=False, effect=e.projectile_effect, effect_value=e.projectile_effect_value, effect_duration=e.projectile_effect_duration))
+                            # 8 directions (4 cardinal + 4 diagonal, pre-normalized)
+                            for dx, dy in _CROSS8:
+                                vx = e.projectile_speed * dx
+                                vy = e.projectile_speed * dy
+                                spawn_projectile(state, ex, ey, vx, vy, e.projectile_damage, e.projectile_color, radius=e.projectile_radius, from_player=False, effect=e.projectile_effect, effect_value=e.projectile_effect_value, effect_duration=e.projectile_effect_duration)
                         elif e.projectile_pattern == 'breath':
                             # short-range fan aimed at player
-                            px, py = state.player.x + state.player.w/2, state.player.y + state.player.h/2
+                            px, py = state.player.cx, state.player.cy
                             dx, dy = px - ex, py - ey
-                            base = math.atan2(dy, dx)
-                            for ang_off in (-0.4, -0.2, 0, 0.2, 0.4):
-                                ang = base + ang_off
-                                vx = e.projectile_speed * math.cos(ang)
-                                vy = e.projectile_speed * math.sin(ang)
-                                state.projectiles.append(Projectile(ex, ey, vx, vy, e.projectile_damage, e.projectile_color, radius=max(6, e.projectile_radius-2), from_player=False, effect=e.projectile_effect, effect_value=e.projectile_effect_value, effect_duration=e.projectile_effect_duration))
+                            # cos/sin of the aim angle straight from the unit vector
+                            dist = math.hypot(dx, dy)
+                            if dist:
+                                cb, sb = dx / dist, dy / dist
+                            else:
+                                cb, sb = 1.0, 0.0  # atan2(0, 0) == 0
+                            for co, so in _BREATH:
+                                # cos/sin(base + offset) by the angle-sum identities
+                                vx = e.projectile_speed * (cb * co - sb * so)
+                                vy = e.projectile_speed * (sb * co + cb * so)
+                                spawn_projectile(state, ex, ey, vx, vy, e.projectile_damage, e.projectile_color, radius=_max(6, e.projectile_radius-2), from_player=False, effect=e.projectile_effect, effect_value=e.projectile_effect_value, effect_duration=e.projectile_effect_duration)
                 # One-off transitions
                 # Boss 5 (Demon Prince) heal to 80% once when low on health
-                if 'heal_to_80_percent' in e.data and e.hp <= e.max_hp * 0.2 and not e.data.get('did_heal', False):
-                    e.data['did_heal'] = True
+                if e.heal_to_80_percent and not e.did_heal and e.hp <= e.max_hp * 0.2:
+                    e.did_heal = True
                     e.hp = int(e.max_hp * 0.8)
                     state.message("Thilreriltic heals!", 2)
                 # Demon King/Queen summon thresholds
-                if 'summon_thresholds' in e.data:
-                    for frac, done in list(e.data['summon_thresholds'].items()):
-                        if not done and e.hp <= e.max_hp * float(frac):
-                            e.data['summon_thresholds'][frac] = True
-                            # summon helpers
-                            count = 3
-                            state.enemies.extend(spawn_minion(state.stage, obstacles, state.new_game_plus) for _ in range(count))
+                thresholds = e.summon_thresholds
+                while thresholds and e.hp <= e.max_hp * thresholds[0]:
+                    thresholds.pop(0)
+                    # summon helpers
+                    count = 3
+                    summoned = [spawn_minion(state.stage, state.obstacle_rects, state.free_cells, state.new_game_plus) for _ in range(count)]
+                    bind_death_sounds(state, summoned)
+                    state.enemies.extend(summoned)
                 # Enemy special: heal over time if not hit (Lich)
-                if getattr(e, 'can_heal', False):
-                    last_hit = getattr(e, 'last_hit_time', 0.0)
-                    if time.time() - last_hit >= getattr(e, 'heal_delay', 3.0):
-                        e.hp = min(e.max_hp, e.hp + e.heal_per_sec * dt)
+                if e.can_heal:
+                    if state.play_time - e.last_hit_time >= e.heal_delay:
+                        e.hp = _min(e.max_hp, e.hp + e.heal_per_sec * dt)
                 # Enemy special: speed double at 50%
-                if getattr(e, 'speed_doubles_at_half', False) and not getattr(e, 'sped_up', False):
+                if e.speed_doubles_at_half and not e.sped_up:
                     if e.hp <= e.max_hp * 0.5:
                         e.speed *= 2.0
                         e.sped_up = True
-                resolve_entity_collision(e, obstacles, prev_x, prev_y)
+                resolve_entity_collision(e, state.obstacle_rects, prev_x, prev_y)
                 
-                entity_hit_player(e, state.player, dt)
-                if e.hp > 0:
-                    alive.append(e)
-                else:
+                if e.hp <= 0:
                     # Demon King: revive once on death (phase 2)
-                    if e.name == 'Zasu (Demon King)' and not getattr(e, 'revived_once', False):
+                    if e.name == 'Zasu (Demon King)' and not e.revived_once:
                         e.revived_once = True
                         e.hp = int(e.max_hp * 0.75)
                         e.damage = int(e.damage * 1.2)
                         e.speed += 0.3
-                        alive.append(e)
-                        continue
                     # Demon Queen: require sword for final blow
-                    if e.name == SECRET_BOSS[0] and e.data.get('must_die_by_sword', False):
-                        if not e.data.get('last_hit_by_sword', False):
-                            # Prevent death; leave at 1 HP
-                            e.hp = 1
-                            alive.append(e)
-                            state.message('The Queen can only be felled by the sword!', 2)
-                            continue
-                    # Twin Ghouls: buff twin on death
-                    if e.name in ["Rox (Big Twin)", "Tox (Small Twin)"]:
-                        for oth in state.enemies:
-                            if oth is not e and oth.name in ["Rox (Big Twin)", "Tox (Small Twin)"] and oth.hp > 0:
-                                oth.damage = int(oth.damage * 1.5)
-                                break
-                    # drop rewards
-                    is_boss = (state.wave == MINION_WAVES_PER_STAGE + 1)
-                    # Only drop boss rewards when boss is actually killed
-                    if is_boss:
-                        drop_rewards(state, True, state.stage, e.name)
-                    else:
-                        drop_rewards(state, False, state.stage)
-                    # Score for kill and death sounds
-                    state.score += 10 if is_boss else 3
-                    if is_boss:
-                        snd = state.sounds.get('boss_explode')
-                        if snd:
-                            snd.play()
+                    elif (e.name == SECRET_BOSS[0] and e.must_die_by_sword
+                          and not e.last_hit_by_sword):
+                        # Prevent death; leave at 1 HP
+                        e.hp = 1
+                        state.message('The Queen can only be felled by the sword!', 2)
                     else:
-                        # choose sound by enemy name
-                        if e.name == 'Imp':
-                            snd = state.sounds.get('imp_die')
-                        elif e.name in ('Skeleton', 'Undead Lich'):
-                            snd = state.sounds.get('undead_die')
-                        else:
-                            snd = None
-                        if snd:
-                            snd.play()
-            state.enemies = alive
-
-            projectile_hits(state.enemies, state.projectiles, state.player, obstacles)
+                        # Rewards, score and sounds are handled after the update pass
+                        deaths.append(e)
+                        continue
+                # Nothing has died yet this frame: survivors are already in place
+                if w != r - 1:
+                    enemies[w] = e
+                w += 1
+            if w < len(enemies):
+                del enemies[w:]
+            if deaths:
+                handle_enemy_deaths(state, deaths)
+
+            # Contact damage: one C-level overlap scan over the survivors;
+            # the first hit makes the player invulnerable, so stop there
+            if state.player.invuln_timer <= 0 and enemies:
+                for i in state.player.rect().collidelistall([e.rect() for e in enemies]):
+                    entity_hit_player(enemies[i], state.player, dt)
+                    if state.player.invuln_timer > 0:
+                        break
 
-            # Inter-wave cooldown countdown
-            if state.pending_spawn and state.wave_cooldown > 0:
-                state.wave_cooldown = max(0.0, state.wave_cooldown - dt)
+            state.enemy_grid = build_enemy_grid(state.enemies)
+            projectile_hits(state.projectiles, state.player, state.enemy_grid, state.obstacle_grid, state.play_time,
+                            state.projectile_pool)
 
             # Spawn logic with 5s delay between waves
             if not state.enemies:
-                if state.wave <= MINION_WAVES_PER_STAGE:
-                    if not state.pending_spawn:
+                if state.is_minion_wave:
+                    if state.next_spawn_time is None:
                         # just finished a wave; start cooldown and reset armor
-                        state.pending_spawn = True
-                        state.wave_cooldown = 5.0
+                        state.next_spawn_time = state.game_clock + 5.0
                         # regen armor to current armor's hits
-                        curr_armor = get_armor(state.player)
-                        state.player.armor_hits_remaining = curr_armor["hits"]
+                        state.player.armor_hits_remaining = state.player.max_armor_hits
                         state.message("Wave cleared. Next wave in 5s.", 2)
-                    elif state.wave_cooldown == 0.0:
+                    elif state.game_clock >= state.next_spawn_time:
                         # spawn a wave of minions
                         base_count = 3 + state.stage  # ramp up
                         count = int(base_count * (1.3 ** (state.wave - 1)))  # 30% increase each wave
-                        state.enemies = [spawn_minion(state.stage, obstacles, state.new_game_plus) for _ in range(count)]
-                        state.wave += 1
-                        state.pending_spawn = False
-                elif state.wave == MINION_WAVES_PER_STAGE + 1:
-                    if not state.pending_spawn:
-                        state.pending_spawn = True
-                        state.wave_cooldown = 5.0
+                        state.enemies = [spawn_minion(state.stage, state.obstacle_rects, state.free_cells, state.new_game_plus) for _ in range(count)]
+                        bind_death_sounds(state, state.enemies)
+                        state.set_wave(state.wave + 1)
+                        state.next_spawn_time = None
+                elif state.is_boss_wave:
+                    if state.next_spawn_time is None:
+                        state.next_spawn_time = state.game_clock + 5.0
                         state.message("Final wave cleared. Boss in 5s.", 2)
-                    elif state.wave_cooldown == 0.0:
+                    elif state.game_clock >= state.next_spawn_time:
                         # spawn boss
-                        state.enemies = spawn_boss(state.stage, obstacles, state.new_game_plus)
-                        state.wave += 1
-                        state.pending_spawn = False
+                        state.enemies = spawn_boss(state.stage, state.obstacle_rects, state.free_cells, state.new_game_plus)
+                        state.set_wave(state.wave + 1)
+                        state.next_spawn_time = None
+                        if state.stage == SECRET_BOSS_STAGE:
+                            state.banner("SECRET BOSS", PURPLE)
+                        else:
+                            state.banner("BOSS STAGE", RED)
                 else:
                     # Stage clear
                     if state.stage == 10:
@@ -2822,10 +3281,10 @@ def main():
                         state.message(f"You have won! Starting New Game+ {state.new_game_plus}...", 4)
                         # Reset to stage 1 but keep player stats and increase difficulty
                         state.stage = 1
-                        state.wave = 1
+                        state.set_wave(1)
                         # Clear equipment and reopen merchant
-                        state.player.weapon_id = "starter"
-                        state.player.armor_id = "none"
+                        equip_weapon(state.player, "starter")
+                        equip_armor(state.player, "none")
                         state.player.armor_hits_remaining = 0
                         # Double all enemy health and damage for this NG+ run
                         # This will be handled in spawn functions
@@ -2838,18 +3297,19 @@ def main():
                     replenish_armor(state.player)
                     in_safe_area_setup(state)
                     obstacles = []
+                    prepare_arena(state, obstacles)
 
-        # Mana regen slow
-        if not state.in_safe_area and random.random() < 0.02:
-            state.player.mana = min(state.player.max_mana, state.player.mana + 1)
+        # Mana regen slow: random ticks, scheduled with exponential gaps
+        if state.game_clock >= state.next_mana_regen_time:
+            state.next_mana_regen_time = state.game_clock + _expovariate(MANA_REGEN_RATE)
+            if not state.in_safe_area:
+                state.player.mana = _min(state.player.max_mana, state.player.mana + 1)
         
         # Health regen over time (in and out of combat), disabled during no-heal
-        if not state.paused:
-            state.hp_regen_timer += dt
-            if state.hp_regen_timer >= state.hp_regen_interval:
-                state.hp_regen_timer -= state.hp_regen_interval
-                if state.player.no_heal_time_left <= 0:
-                    state.player.hp = min(state.player.max_hp, state.player.hp + state.hp_regen_amount)
+        if state.game_clock >= state.next_hp_regen_time:
+            state.next_hp_regen_time += state.hp_regen_interval
+            if state.player.no_heal_time_left <= 0:
+                state.player.hp = _min(state.player.max_hp, state.player.hp + state.hp_regen_amount)
 
         # Pickups
         check_pickups(state)
@@ -2864,58 +3324,103 @@ def main():
             state.player.mana = state.player.max_mana
             state.message("You fell... Returning to safe area. Lost 50% gold!", 3)
 
-        # Draw
-        screen.fill(BG_COLOR)
+        # Idle safe area: the last frame is still on screen, skip drawing and slow down.
+        # full_redraw (scene change, menus, fullscreen toggle, expose) always repaints
+        if state.in_safe_area and not state.full_redraw:
+            view_key = _hub_view_key(state)
+            state.hub_idle = view_key == state.hub_view_key
+            state.hub_view_key = view_key
+            if state.hub_idle:
+                continue
+        else:
+            state.hub_view_key = None
+            state.hub_idle = False
 
+        # Draw
         if state.in_safe_area:
-            # Draw a simple hub and merchant
-            pygame.draw.rect(screen, (25, 40, 25), (0, 100, WIDTH, HEIGHT-200))
-            pygame.draw.rect(screen, (60, 60, 20), merchant_rect)
-            # Draw merchant NPC
-            pygame.draw.rect(screen, (40, 40, 10), merchant_rect, 2)
-            pygame.draw.rect(screen, merchant.color, merchant.rect())
+            # Hub and merchant are pre-rendered
+            screen.blit(safe_bg, (0, 0))
             if has_god_equipment(state.player):
-                label = font_small.render("Merchant: You have achieved ultimate power! | N=Start Stage", True, WHITE)
+                label = render_text(state, font_small, "Merchant: You have achieved ultimate power! | N=Start Stage", WHITE)
             else:
-                label = font_small.render("Merchant: Q=Buy Next Weapon | E=Buy Next Armor | N=Start Stage", True, WHITE)
+                label = render_text(state, font_small, "Merchant: Q=Buy Next Weapon | E=Buy Next Armor | N=Start Stage", WHITE)
             screen.blit(label, (WIDTH//2 - label.get_width()//2, 120))
             if state.player.rect().colliderect(merchant_rect) and not has_god_equipment(state.player):
                 # Show next items and prices
-                w_idx = ORDERED_WEAPONS.index(state.player.weapon_id)
-                a_idx = ORDERED_ARMORS.index(state.player.armor_id)
-                next_w = ORDERED_WEAPONS[(w_idx + 1) % len(ORDERED_WEAPONS)]
-                next_a = ORDERED_ARMORS[(a_idx + 1) % len(ORDERED_ARMORS)]
-                w = WEAPONS[next_w]
-                a = ARMORS[next_a]
-                hint1 = font_small.render(f"Next Weapon: {w['label']} ({w['price']}g)  Range {w['range']}  +DMG {w['dmg']}  x{w['mult']}", True, YELLOW)
-                hint2 = font_small.render(f"Next Armor: {a['label']} ({a['price']}g)  Hits {a['hits']}", True, YELLOW)
+                next_w = state.player.next_weapon_id
+                next_a = state.player.next_armor_id
+                hints = state.merchant_hints.get((next_w, next_a))
+                if hints is None:
+                    w = WEAPONS[next_w]
+                    a = ARMORS[next_a]
+                    hints = state.merchant_hints[(next_w, next_a)] = (
+                        font_small.render(f"Next Weapon: {w['label']} ({w['price']}g)  Range {w['range']}  +DMG {w['dmg']}  x{w['mult']}", True, YELLOW),
+                        font_small.render(f"Next Armor: {a['label']} ({a['price']}g)  Hits {a['hits']}", True, YELLOW),
+                    )
+                hint1, hint2 = hints
                 screen.blit(hint1, (WIDTH//2 - hint1.get_width()//2, 145))
                 screen.blit(hint2, (WIDTH//2 - hint2.get_width()//2, 165))
         else:
-            # Arena
-            pygame.draw.rect(screen, (30, 30, 35), (0, 0, WIDTH, HEIGHT))
-            draw_obstacles(screen, obstacles)
+            # Arena floor and obstacles are pre-rendered per stage
+            if state.arena_bg is None:
+                state.arena_bg = render_arena_bg([])
+            screen.blit(state.arena_bg, (0, 0))
 
-        draw_player(screen, state.player)
-        
-        for e in state.enemies:
-            draw_enemy(screen, e, state)
+        # Collect what moved this frame so only those areas are pushed to the display
+        dirty = [draw_player(screen, state.player)]
         
-        for pr in state.projectiles:
-            pygame.draw.circle(screen, pr.color, pr.pos(), pr.radius)
+        dirty += draw_enemies(screen, state.enemies, state)
         
-        draw_pickups(screen, state.drops)
-        draw_hud(screen, font_small, state.player, state)
+        dirty += draw_projectiles(screen, state.projectiles)
         
-        if state.boss_stage and state.boss_banner_timer > 0:
-            banner_text = font_large.render("BOSS STAGE", True, RED)
-            screen.blit(banner_text, (WIDTH//2 - banner_text.get_width()//2, HEIGHT//2 - 50))
+        dirty += draw_pickups(screen, state.drops)
+        dirty += draw_hud(screen, font_small, state.player, state)
         
-        if state.secret_boss_stage and state.boss_banner_timer > 0:
-            banner_text = font_large.render("SECRET BOSS", True, PURPLE)
-            screen.blit(banner_text, (WIDTH//2 - banner_text.get_width()//2, HEIGHT//2 - 50))
+        if state.current_banner:
+            banner = state.current_banner
+            dirty.append(screen.blit(banner, (WIDTH//2 - banner.get_width()//2, HEIGHT//2 - 50)))
         
-        if show_stats:
-            draw_stats_page(screen, font_small, state.player)
+        if state.show_stats:
+            # Full-screen overlay; also flips once more after it is closed
+            draw_stats_page(screen, font_small, state.player, state)
+            state.full_redraw = True
         
-        pygame.display.flip()
+        # Push the HUD band plus this and last frame's entity rects (erasing old positions)
+        update_rects = [HUD_BAND] + state.last_dirty + dirty
+        state.last_dirty = dirty
+        if state.full_redraw or sum(r.w * r.h for r in update_rects) > WIDTH * HEIGHT * DIRTY_FLIP_RATIO:
+            pygame.display.flip()
+            state.full_redraw = False
+        else:
+            pygame.display.update(update_rects)
+
+
+def run(argv=None):
+    """Command-line entry point with optional profiling (see README)"""
+    parser = argparse.ArgumentParser(description="Sword & Magic")
+    parser.add_argument("--profile", metavar="OUT.prof",
+                        help="record the session with cProfile and write the stats to this file")
+    parser.add_argument("--memprofile", action="store_true",
+                        help="trace allocations and print the top allocation sites on exit")
+    args = parser.parse_args(argv)
+
+    if args.memprofile:
+        tracemalloc.start()
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        main()
+    finally:
+        # main() leaves through sys.exit on quit, so dump results on the way out
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if args.memprofile:
+            for stat in tracemalloc.take_snapshot().statistics("lineno")[:15]:
+                print(stat)
+
+
+if __name__ == "__main__":
+    run()